@@ -0,0 +1,96 @@
+"""
+Peak-RSS benchmark for loading market_data.csv as the strategy does.
+
+Generates CSV files of growing size (one row per symbol and minute) and loads
+one symbol from each in a fresh subprocess, once with the old full
+``pd.read_csv`` and once with the bounded loader (the range of a live
+dataframe plus margin). The bounded column should stay flat as the file grows.
+
+    python benchmarks/memory_profile.py [--minutes 10000 40000 160000]
+"""
+import argparse
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+SYMBOLS = [f"SYM{i}USDT" for i in range(30)]
+LOOKBACK_MINUTES = 200  # candles of a live dataframe + liquidation_csv_lookback_margin
+
+
+def generate_csv(path, minutes):
+    from liquidation_collector.persistence import CSV_HEADER
+
+    start = datetime(2024, 1, 1)
+    with open(path, 'w') as file:
+        file.write(','.join(CSV_HEADER) + '\n')
+        for minute in range(minutes):
+            timestamp = (start + timedelta(minutes=minute)).strftime("%Y-%m-%d %H:%M:%S")
+            for i, symbol in enumerate(SYMBOLS):
+                file.write(f"{symbol},{timestamp},{minute % 3},{i % 2},1234.5,0.0,{minute % 7},3,"
+                           f"184668.3798924,3262056.4487021994,0.0001\n")
+    return start + timedelta(minutes=minutes - 1)
+
+
+def peak_rss_mb():
+    # ru_maxrss ist unter Linux in KiB, unter macOS in Bytes
+    scale = 1 if sys.platform == 'darwin' else 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale / 2**20
+
+
+def child(path, mode, last):
+    import pandas as pd
+    from liquidation_collector.loader import load_historical_data
+
+    baseline = peak_rss_mb()
+    started = time.perf_counter()
+    if mode == 'full':
+        data = pd.read_csv(path)
+        data = data[data['symbol'] == SYMBOLS[0]]
+    else:
+        since = pd.Timestamp(last, tz='UTC') - pd.Timedelta(minutes=LOOKBACK_MINUTES)
+        data = load_historical_data(path, SYMBOLS[0], since=since)
+    elapsed = time.perf_counter() - started
+    print(f"{peak_rss_mb() - baseline:.1f} {elapsed:.3f} {len(data)}")
+
+
+def run(mode, path, last):
+    output = subprocess.run(
+        [sys.executable, __file__, '--child', path, mode, last],
+        check=True, capture_output=True, text=True
+    ).stdout.strip().splitlines()[-1]
+    rss, elapsed, rows = output.split()
+    return float(rss), float(elapsed), int(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--minutes', type=int, nargs='+', default=[10_000, 40_000, 160_000])
+    parser.add_argument('--child', nargs=3, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(*args.child)
+        return
+
+    print(f"{'rows':>10} {'file MB':>8} | {'full RSS MB':>11} {'s':>6} | {'bounded RSS MB':>14} {'s':>6}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for minutes in args.minutes:
+            path = os.path.join(tmp, f"market_data_{minutes}.csv")
+            last = generate_csv(path, minutes).strftime("%Y-%m-%d %H:%M:%S")
+            size = os.path.getsize(path) / 2**20
+            full_rss, full_s, _ = run('full', path, last)
+            bounded_rss, bounded_s, _ = run('bounded', path, last)
+            print(f"{minutes * len(SYMBOLS):>10} {size:>8.1f} | {full_rss:>11.1f} {full_s:>6.2f} | "
+                  f"{bounded_rss:>14.1f} {bounded_s:>6.2f}")
+            os.remove(path)
+
+
+if __name__ == '__main__':
+    main()
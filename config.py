@@ -21,10 +21,30 @@ TRADE_URL_TEMPLATE = 'wss://stream.binance.com:9443/ws/{}@aggTrade'
 
 # Binance API URLs
 FUNDING_RATE_URL = "https://fapi.binance.com/fapi/v1/premiumIndex"
+AGG_TRADES_URL = "https://api.binance.com/api/v3/aggTrades"
+
+# Gap-fill of missed trade buckets from the REST API
+BACKFILL_CONCURRENCY = 4
+BACKFILL_MAX_AGE_MINUTES = 1440
 
 # Aggregation settings
 AGGREGATION_INTERVAL_MINUTES = 1
 LARGE_TRADE_THRESHOLD_USD = 10000
 
+# Embedded mode: per-symbol ring buffer of one-minute buckets
+RING_BUFFER_CAPACITY = 1440  # one day
+RING_BUFFER_DIR = None  # None = in-process memory, otherwise directory for mmap files
+
+# CSV retention: rows older than this are dropped by the writer (0 = keep everything)
+CSV_RETENTION_DAYS = 0
+
+# Liquidation cascade alerts (sub-minute, published via Redis pub/sub)
+CASCADE_ALERT_CHANNEL = "liquidation_alerts"
+CASCADE_THRESHOLDS_USD = {5: 250000, 15: 500000, 60: 1000000}  # window seconds -> liquidated USD
+IMBALANCE_WINDOW_SECONDS = 15
+IMBALANCE_THRESHOLD = 0.8  # |long - short| / (long + short) of large trades
+IMBALANCE_MIN_USD = 1000000
+ALERT_COOLDOWN_SECONDS = 30
+
 # File paths
 DEFAULT_CSV_PATH = '/home/olav/freqtrade_redis_ws/freqtrade/user_data/strategies/market_data.csv'
\ No newline at end of file
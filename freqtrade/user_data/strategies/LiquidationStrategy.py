@@ -35,16 +35,81 @@ from freqtrade.strategy import (
 import talib.abstract as ta
 import pandas_ta as pta
 from technical import qtpylib
-import redis
 import os
 import technical.indicators as ftt
 
+from liquidation_collector import get_redis_client
+from liquidation_collector.loader import (
+    apply_latest_from_redis,
+    load_historical_data,
+    merge_historical_data,
+    merge_ring_buffer,
+)
+
 class LiquidationStrategy(IStrategy):  
     def __init__(self, config: dict) -> None:  
         super().__init__(config)  
-        # Redis-Verbindung herstellen  
-        self.redis_client = redis.StrictRedis(host='redis', port=6379, db=0)  
-        print("Redis connection established")  
+        # Redis-Verbindung wird erst beim ersten Zugriff hergestellt  
+        self._redis_client = None  
+        # Pfad zur CSV-Datei  
+        self.csv_file_path = config.get(  
+            'liquidation_csv_path',  
+            os.getenv('CSV_FILE_PATH', '/freqtrade/user_data/strategies/market_data.csv')  
+        )  
+        # Zusätzliche Minuten, die vor der ersten Kerze des DataFrames aus der CSV-Datei geladen werden  
+        self.csv_lookback_margin = config.get('liquidation_csv_lookback_margin', 100)  
+        # "redis" (separate services) oder "embedded" (Collector läuft im Freqtrade-Prozess)  
+        self.liquidation_mode = config.get('liquidation_mode', 'redis')  
+        self.embedded_collector = None  
+        # Letzter Kaskaden-Alarm pro Binance-Symbol (sekundengenau, ohne auf die nächste Kerze zu warten)  
+        self.liquidation_alerts = {}  
+
+    @property  
+    def redis_client(self):  
+        if self._redis_client is None:  
+            self._redis_client = get_redis_client()  
+        return self._redis_client  
+
+    @redis_client.setter  
+    def redis_client(self, client):  
+        self._redis_client = client  
+
+    def bot_start(self, **kwargs) -> None:  
+        """  
+        Startet im Embedded-Modus den Collector als Hintergrund-Thread und abonniert  
+        die Kaskaden-Alarme (nur live/dry-run).  
+        """  
+        if not self.is_live_run():  
+            return  
+        if self.liquidation_mode == 'embedded':  
+            from liquidation_collector.embedded import start_embedded  
+            self.embedded_collector = start_embedded(  
+                csv_file_path=self.csv_file_path,  
+                ring_buffer_dir=self.config.get('liquidation_ring_buffer_dir'),  
+            )  
+        if self.config.get('liquidation_alerts', True):  
+            if self.embedded_collector is not None:  
+                self.embedded_collector.add_alert_callback(self.on_liquidation_alert)  
+            else:  
+                from liquidation_collector.cascade import AlertSubscriber  
+                AlertSubscriber(self.on_liquidation_alert).start()  
+
+    def is_live_run(self) -> bool:  
+        """  
+        True im Live- und Dry-Run-Modus. Nur dort laufen Collector, Redis und Alarme;  
+        Backtesting, Hyperopt und Plotting verwenden ausschließlich die CSV-Datei.  
+        """  
+        return self.dp is not None and self.dp.runmode.value in ('live', 'dry_run')  
+
+    def on_liquidation_alert(self, alert: dict) -> None:  
+        """  
+        Wird aus einem Hintergrund-Thread aufgerufen, sobald der Collector eine  
+        Liquidationskaskade oder ein starkes Trade-Ungleichgewicht erkennt.  
+        """  
+        self.liquidation_alerts[alert['symbol']] = alert  
+        self.dp.send_msg(  
+            f"{alert['type']} {alert['symbol']}: {alert['usd']:,.0f} USD in {alert['window']}s ({alert['side']})"  
+        )  
 
         
     INTERFACE_VERSION = 3
@@ -141,113 +206,26 @@ class LiquidationStrategy(IStrategy):
         bybit_pair = metadata['pair']  
         binance_pair = self.bybit_to_binance_pair(bybit_pair)  
 
-        # Pfad zur CSV-Datei  
-        csv_file_path = '/freqtrade/user_data/strategies/market_data.csv'  
-
-        # 1. Historische Daten aus der CSV-Datei laden  
-        if os.path.exists(csv_file_path):  
-            print(f"Lade historische Daten aus {csv_file_path}...")  
-            if os.access(csv_file_path, os.R_OK):  
-                # print(f"Zugriff auf die Datei ist möglich: {csv_file_path}")  
-                try:  
-                    # CSV-Datei laden  
-                    historical_data = pd.read_csv(csv_file_path)  
-                    # print(f"CSV-Daten geladen: {len(historical_data)} Zeilen gefunden.")  
-
-                    # Sicherstellen, dass die Spalte 'timestamp' existiert  
-                    if 'timestamp' not in historical_data.columns:  
-                        raise KeyError("Die Spalte 'timestamp' fehlt in der CSV-Datei.")  
-
-                    # Filtere die Daten für das aktuelle Symbol  
-                    historical_data = historical_data[historical_data['symbol'] == binance_pair]  
-                    # print(f"Gefilterte Daten für {binance_pair}: {len(historical_data)} Zeilen gefunden.")  
-
-                    # Sicherstellen, dass der Timestamp als Datumsformat vorliegt  
-                    historical_data['timestamp'] = pd.to_datetime(historical_data['timestamp'], errors='coerce')  
-                    if historical_data['timestamp'].isnull().any():  
-                        raise ValueError("Ungültige Werte in der Spalte 'timestamp' in der CSV-Datei.")  
-
-                    # Runden der Timestamps auf die Minute  
-                    historical_data['timestamp'] = historical_data['timestamp'].dt.floor('min')  
-
-                    # Zeitzoneninformation hinzufügen (UTC)  
-                    historical_data['timestamp'] = historical_data['timestamp'].dt.tz_localize('UTC')  
-
-                    # Sicherstellen, dass die Spalte 'date' im DataFrame als Datumsformat vorliegt  
-                    if 'date' in dataframe.columns:  
-                        dataframe['date'] = pd.to_datetime(dataframe['date'], errors='coerce')  
-                        if dataframe['date'].isnull().any():  
-                            raise ValueError("Ungültige Werte in der Spalte 'date' im DataFrame.")  
-
-                        # Runden der Timestamps auf die Minute  
-                        dataframe['date'] = dataframe['date'].dt.floor('min')  
-
-                    # Debugging: Zeige die ersten paar Timestamps aus beiden DataFrames  
-                    # print("Erste Timestamps in historical_data:", historical_data['timestamp'].head())  
-                    # print("Erste Timestamps im dataframe (date):", dataframe['date'].head())  
-
-                    # Überprüfen, ob es Übereinstimmungen gibt  
-                    common_timestamps = set(dataframe['date']).intersection(set(historical_data['timestamp']))  
-                    if not common_timestamps:  
-                        print("Warnung: Keine gemeinsamen Timestamps zwischen dataframe und historical_data gefunden!")  
-                        print("Timestamps im dataframe (date):", dataframe['date'].unique())  
-                        print("Timestamps in historical_data:", historical_data['timestamp'].unique())  
-
-                    # Mappen der historischen Daten auf den bestehenden DataFrame basierend auf dem Timestamp  
-                    for col in ['liq_long_count', 'liq_short_count', 'liq_long_usd_size', 'liq_short_usd_size',  
-                                'trade_long_count', 'trade_short_count', 'trade_long_usd_size', 'trade_short_usd_size',  
-                                'funding_rate']:  
-                        if col in historical_data.columns:  
-                            # Werte basierend auf dem Timestamp übernehmen  
-                            dataframe[col] = dataframe['date'].map(  
-                                historical_data.set_index('timestamp')[col]  
-                            ).fillna(0.0)  # Fehlende Werte mit 0.0 auffüllen  
-                        else:  
-                            dataframe[col] = 0.0  # Falls die Spalte fehlt, mit 0.0 auffüllen  
-
-                except Exception as e:  
-                    print(f"Fehler beim Lesen der CSV-Datei: {e}")  
-            else:  
-                print(f"Keine Leseberechtigung für die Datei: {csv_file_path}")  
-        else:  
-            print(f"CSV-Datei {csv_file_path} nicht gefunden. Historische Daten werden übersprungen.")  
-
-        # 2. Aktuelle Daten aus Redis abrufen und in die letzte Zeile einfügen  
-        # Liquidationsdaten aus Redis abrufen  
-        liquidation_key = f"liquidation:{binance_pair}"  
-        liquidation_data = self.redis_client.hgetall(liquidation_key)  
-        if liquidation_data:  
-            dataframe.loc[dataframe.index[-1], 'liq_long_count'] = int(liquidation_data.get(b'long_count', b'0').decode('utf-8'))  
-            dataframe.loc[dataframe.index[-1], 'liq_short_count'] = int(liquidation_data.get(b'short_count', b'0').decode('utf-8'))  
-            dataframe.loc[dataframe.index[-1], 'liq_long_usd_size'] = float(liquidation_data.get(b'long_usd_size', b'0').decode('utf-8'))  
-            dataframe.loc[dataframe.index[-1], 'liq_short_usd_size'] = float(liquidation_data.get(b'short_usd_size', b'0').decode('utf-8'))  
-        else:  
-            dataframe.loc[dataframe.index[-1], 'liq_long_count'] = 0  
-            dataframe.loc[dataframe.index[-1], 'liq_short_count'] = 0  
-            dataframe.loc[dataframe.index[-1], 'liq_long_usd_size'] = 0.0  
-            dataframe.loc[dataframe.index[-1], 'liq_short_usd_size'] = 0.0  
-
-        # Große Trades aus Redis abrufen  
-        trade_key = f"large_trade:{binance_pair}"  
-        trade_data = self.redis_client.hgetall(trade_key)  
-        if trade_data:  
-            dataframe.loc[dataframe.index[-1], 'trade_long_count'] = int(trade_data.get(b'long_count', b'0').decode('utf-8'))  
-            dataframe.loc[dataframe.index[-1], 'trade_short_count'] = int(trade_data.get(b'short_count', b'0').decode('utf-8'))  
-            dataframe.loc[dataframe.index[-1], 'trade_long_usd_size'] = float(trade_data.get(b'long_usd_size', b'0').decode('utf-8'))  
-            dataframe.loc[dataframe.index[-1], 'trade_short_usd_size'] = float(trade_data.get(b'short_usd_size', b'0').decode('utf-8'))  
-        else:  
-            dataframe.loc[dataframe.index[-1], 'trade_long_count'] = 0  
-            dataframe.loc[dataframe.index[-1], 'trade_short_count'] = 0  
-            dataframe.loc[dataframe.index[-1], 'trade_long_usd_size'] = 0.0  
-            dataframe.loc[dataframe.index[-1], 'trade_short_usd_size'] = 0.0  
-
-        # Funding Rate aus Redis abrufen  
-        funding_key = f"funding_rate:{binance_pair}"  
-        funding_data = self.redis_client.hgetall(funding_key)  
-        if funding_data:  
-            dataframe.loc[dataframe.index[-1], 'funding_rate'] = float(funding_data.get(b'funding_rate', b'0').decode('utf-8'))  
+        if self.embedded_collector is not None:  
+            # Embedded-Modus: Daten direkt aus dem Ring-Buffer, ohne CSV- und Redis-Zugriff  
+            merge_ring_buffer(dataframe, self.embedded_collector.ring_buffer(binance_pair))  
         else:  
-            dataframe.loc[dataframe.index[-1], 'funding_rate'] = 0.0  
+            # 1. Historische Daten aus der CSV-Datei laden (nur der Zeitraum des DataFrames,  
+            #    im Backtesting also der komplette Timerange)  
+            try:  
+                since = pd.to_datetime(dataframe['date'], utc=True).iloc[0] - timedelta(  
+                    minutes=self.csv_lookback_margin  
+                )  
+                historical_data = load_historical_data(self.csv_file_path, binance_pair, since=since)  
+                if historical_data is not None:  
+                    merge_historical_data(dataframe, historical_data)  
+            except Exception as e:  
+                print(f"Fehler beim Lesen der CSV-Datei: {e}")  
+
+            # 2. Aktuelle Daten aus Redis abrufen und in die letzte Zeile einfügen  
+            #    (nur Redis-Modus im Live-/Dry-Run, Embedded-Deployments haben kein Redis)  
+            if self.liquidation_mode == 'redis' and self.is_live_run():  
+                apply_latest_from_redis(dataframe, self.redis_client, binance_pair)  
 
         dataframe["y_funding_rates"] = (dataframe["funding_rate"] * 3 * 365) * 100 
 
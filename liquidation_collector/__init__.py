@@ -0,0 +1,17 @@
+"""
+Importable core of the liquidation and large-trade collector.
+
+Importing the package has no side effects: no connections are opened and no
+event loop is started. Services call the explicit ``start()`` entry points in
+``liquidation_collector.streams`` and ``liquidation_collector.persistence``;
+the strategy uses ``liquidation_collector.loader``.
+"""
+from .aggregator import Aggregator
+from .redis_client import check_connection, get_redis_client, set_redis_client
+
+__all__ = [
+    "Aggregator",
+    "check_connection",
+    "get_redis_client",
+    "set_redis_client",
+]
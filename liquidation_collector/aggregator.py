@@ -0,0 +1,66 @@
+"""
+In-memory aggregation of liquidations and large trades per symbol.
+"""
+from . import settings
+
+
+def empty_bucket():
+    """Return a zeroed aggregation bucket."""
+    return {"long_usd_size": 0, "short_usd_size": 0, "long_count": 0, "short_count": 0}
+
+
+class Aggregator:
+    """Collects liquidations and large trades per symbol until the next flush."""
+
+    def __init__(self, symbols=None, large_trade_threshold=None):
+        self.symbols = list(symbols if symbols is not None else settings.PAIRLIST_SYMBOLS)
+        self._symbol_set = set(self.symbols)
+        self.large_trade_threshold = (
+            large_trade_threshold if large_trade_threshold is not None
+            else settings.LARGE_TRADE_THRESHOLD_USD
+        )
+        self.liquidation_data = {symbol: empty_bucket() for symbol in self.symbols}
+        self.trade_data = {symbol: empty_bucket() for symbol in self.symbols}
+        # Set to track unknown symbols (to avoid spamming logs)
+        self.unknown_symbols = set()
+
+    def add_liquidation(self, symbol, side, price, quantity):
+        """Add a forced order; returns False if the symbol is not monitored."""
+        if symbol not in self._symbol_set:
+            self.unknown_symbols.add(symbol)
+            return False
+
+        usd_size = price * quantity
+        bucket = self.liquidation_data[symbol]
+        if side == "BUY":  # Long-Liquidation
+            bucket["long_count"] += 1
+            bucket["long_usd_size"] += usd_size
+        else:  # Short-Liquidation
+            bucket["short_count"] += 1
+            bucket["short_usd_size"] += usd_size
+        return True
+
+    def add_trade(self, symbol, price, quantity, is_buyer_maker):
+        """Add an aggregated trade; returns True if it counted as a large trade."""
+        usd_size = price * quantity
+        if usd_size <= self.large_trade_threshold or symbol not in self._symbol_set:
+            return False
+
+        bucket = self.trade_data[symbol]
+        if is_buyer_maker:  # Maker-Side: SELL -> Short-Trade
+            bucket["short_count"] += 1
+            bucket["short_usd_size"] += usd_size
+        else:  # Maker-Side: BUY -> Long-Trade
+            bucket["long_count"] += 1
+            bucket["long_usd_size"] += usd_size
+        return True
+
+    def flush(self):
+        """Return the current ``(liquidations, trades)`` buckets and start new ones."""
+        liquidations, self.liquidation_data = (
+            self.liquidation_data, {symbol: empty_bucket() for symbol in self.symbols}
+        )
+        trades, self.trade_data = (
+            self.trade_data, {symbol: empty_bucket() for symbol in self.symbols}
+        )
+        return liquidations, trades
@@ -0,0 +1,110 @@
+"""
+Gap-fill of large-trade buckets from the Binance aggTrades REST endpoint.
+
+Buckets whose trade stream was not connected for the whole interval are
+registered with the ``Backfiller``. Once the stream is connected again, the
+trades of each missed interval are fetched with bounded concurrency,
+re-aggregated and handed to the sinks via ``write_backfill()``, which replaces
+the incomplete bucket. Liquidations cannot be recovered this way (Binance has
+no REST history for forced orders), so they stay marked as incomplete.
+"""
+import asyncio
+import time
+
+import requests
+
+from . import settings
+from .aggregator import Aggregator
+
+
+def fetch_agg_trades(symbol, start_ms, end_ms, url=None, limit=1000):
+    """Fetch all aggregated trades of ``symbol`` with ``start_ms <= T < end_ms``."""
+    url = url or settings.AGG_TRADES_URL
+    trades = []
+    params = {"symbol": symbol, "startTime": start_ms, "endTime": end_ms - 1, "limit": limit}
+    while True:
+        response = requests.get(url, params=params, timeout=10)
+        response.raise_for_status()
+        page = response.json()
+        in_range = [trade for trade in page if trade['T'] < end_ms]
+        trades.extend(in_range)
+        if len(page) < limit or len(in_range) < len(page):
+            return trades
+        # Weiterblättern über die Trade-ID (fromId), auch wenn viele Trades dieselbe Millisekunde haben
+        params = {"symbol": symbol, "fromId": page[-1]['a'] + 1, "limit": limit}
+
+
+def aggregate_trades(symbol, trades, large_trade_threshold=None):
+    """Aggregate raw aggTrades into a large-trade bucket like the live stream does."""
+    aggregator = Aggregator(symbols=[symbol], large_trade_threshold=large_trade_threshold)
+    for trade in trades:
+        aggregator.add_trade(symbol, float(trade['p']), float(trade['q']), trade['m'])
+    _, buckets = aggregator.flush()
+    return buckets[symbol]
+
+
+class Backfiller:
+    """Queue of incomplete trade buckets that are refilled from REST once possible."""
+
+    def __init__(self, sinks, coverage, url=None, concurrency=None,
+                 large_trade_threshold=None, max_age=None, fetch=fetch_agg_trades):
+        self.sinks = sinks
+        self.coverage = coverage
+        self.url = url or settings.AGG_TRADES_URL
+        self.concurrency = concurrency or settings.BACKFILL_CONCURRENCY
+        self.large_trade_threshold = large_trade_threshold
+        self.max_age = max_age if max_age is not None else settings.BACKFILL_MAX_AGE_MINUTES * 60
+        self._fetch = fetch
+        # (symbol, timestamp) -> (start, end, liquidation bucket of the same interval)
+        self.pending = {}
+
+    def add(self, symbol, start, end, timestamp, liquidation_bucket):
+        self.pending[(symbol, timestamp)] = (start, end, liquidation_bucket)
+
+    async def _fill(self, semaphore, symbol, timestamp, start, end, liquidation_bucket):
+        loop = asyncio.get_running_loop()
+        async with semaphore:
+            trades = await loop.run_in_executor(
+                None, self._fetch, symbol, int(start * 1000), int(end * 1000), self.url
+            )
+        bucket = aggregate_trades(symbol, trades, self.large_trade_threshold)
+        bucket["complete"] = 1
+        for sink in self.sinks:
+            try:
+                sink.write_backfill(timestamp, {symbol: liquidation_bucket}, {symbol: bucket})
+            except Exception as e:
+                print(f"Error writing backfill to {type(sink).__name__}: {e}")
+        del self.pending[(symbol, timestamp)]
+
+    async def run_pending(self, now=None):
+        """Backfill every pending bucket whose trade stream is connected again."""
+        now = time.time() if now is None else now
+        for key, (start, end, _) in list(self.pending.items()):
+            if now - end > self.max_age:
+                print(f"Giving up backfill for {key[0]} at {key[1]}")
+                del self.pending[key]
+
+        ready = [
+            (symbol, timestamp, *entry) for (symbol, timestamp), entry in self.pending.items()
+            if self.coverage.is_connected(f"trade:{symbol}")
+        ]
+        if not ready:
+            return 0
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+        results = await asyncio.gather(
+            *(self._fill(semaphore, *entry) for entry in ready), return_exceptions=True
+        )
+        failed = [r for r in results if isinstance(r, Exception)]
+        if failed:
+            print(f"Backfill failed for {len(failed)} of {len(ready)} buckets, retrying later: {failed[0]}")
+        print(f"Backfilled {len(ready) - len(failed)} trade buckets")
+        return len(ready) - len(failed)
+
+    async def run(self, interval=30):
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.run_pending()
+            except Exception as e:
+                print(f"Error in backfill: {e}")
@@ -0,0 +1,195 @@
+"""
+Sub-minute liquidation-cascade detection.
+
+``CascadeDetector`` keeps per-symbol sliding windows (e.g. 5s/15s/60s) of
+liquidated USD per side and of large-trade USD per side. Every event costs
+O(1) amortized: it is appended to a deque and expired entries are popped from
+the front while a running sum is maintained. When a threshold is crossed an
+alert is handed to the publishers right away instead of waiting for the
+minute flush.
+"""
+import json
+import threading
+import time
+from collections import deque
+
+from . import settings
+from .redis_client import get_redis_client
+
+
+class SlidingWindowSum:
+    """Sum of the values added during the last ``seconds``."""
+
+    def __init__(self, seconds):
+        self.seconds = seconds
+        self.total = 0.0
+        self._events = deque()
+
+    def add(self, timestamp, value):
+        self._events.append((timestamp, value))
+        self.total += value
+        self.expire(timestamp)
+
+    def expire(self, now):
+        events = self._events
+        cutoff = now - self.seconds
+        while events and events[0][0] <= cutoff:
+            self.total -= events.popleft()[1]
+        if not events:
+            self.total = 0.0  # Rundungsfehler der laufenden Summe zurücksetzen
+        return self.total
+
+
+class _SymbolWindows:
+    def __init__(self, liquidation_windows, imbalance_window):
+        self.liq_long = {w: SlidingWindowSum(w) for w in liquidation_windows}
+        self.liq_short = {w: SlidingWindowSum(w) for w in liquidation_windows}
+        self.trade_long = SlidingWindowSum(imbalance_window)
+        self.trade_short = SlidingWindowSum(imbalance_window)
+
+
+class CascadeDetector:
+    """Detects liquidation cascades and large-trade imbalances and publishes alerts."""
+
+    def __init__(self, publishers=None, thresholds=None, imbalance_window=None,
+                 imbalance_threshold=None, imbalance_min_usd=None, cooldown=None, clock=time.time):
+        self.publishers = list(publishers or [])
+        self.thresholds = dict(thresholds or settings.CASCADE_THRESHOLDS_USD)
+        self.imbalance_window = imbalance_window or settings.IMBALANCE_WINDOW_SECONDS
+        self.imbalance_threshold = (
+            imbalance_threshold if imbalance_threshold is not None else settings.IMBALANCE_THRESHOLD
+        )
+        self.imbalance_min_usd = (
+            imbalance_min_usd if imbalance_min_usd is not None else settings.IMBALANCE_MIN_USD
+        )
+        self.cooldown = cooldown if cooldown is not None else settings.ALERT_COOLDOWN_SECONDS
+        self._clock = clock
+        self._windows = {}
+        self._last_alert = {}
+
+    def _symbol(self, symbol):
+        windows = self._windows.get(symbol)
+        if windows is None:
+            windows = self._windows[symbol] = _SymbolWindows(self.thresholds, self.imbalance_window)
+        return windows
+
+    def on_liquidation(self, symbol, side, usd_size, timestamp=None):
+        """Feed a forced order; ``side`` is the order side ("BUY" = long liquidation)."""
+        now = self._clock() if timestamp is None else timestamp
+        windows = self._symbol(symbol)
+        own, other = (
+            (windows.liq_long, windows.liq_short) if side == "BUY"
+            else (windows.liq_short, windows.liq_long)
+        )
+        alerts = []
+        for seconds, threshold in self.thresholds.items():
+            own[seconds].add(now, usd_size)
+            other[seconds].expire(now)
+            long_usd = windows.liq_long[seconds].total
+            short_usd = windows.liq_short[seconds].total
+            if long_usd + short_usd >= threshold:
+                alert = self._alert("liquidation_cascade", symbol, seconds, now, {
+                    "usd": long_usd + short_usd,
+                    "long_usd": long_usd,
+                    "short_usd": short_usd,
+                    "side": "long" if long_usd >= short_usd else "short",
+                    "threshold": threshold,
+                })
+                if alert:
+                    alerts.append(alert)
+        return alerts
+
+    def on_large_trade(self, symbol, is_buyer_maker, usd_size, timestamp=None):
+        """Feed a large trade and check the buy/sell imbalance of the window."""
+        now = self._clock() if timestamp is None else timestamp
+        windows = self._symbol(symbol)
+        if is_buyer_maker:  # Maker-Side: SELL -> Short-Trade
+            windows.trade_short.add(now, usd_size)
+            windows.trade_long.expire(now)
+        else:
+            windows.trade_long.add(now, usd_size)
+            windows.trade_short.expire(now)
+
+        long_usd, short_usd = windows.trade_long.total, windows.trade_short.total
+        total = long_usd + short_usd
+        if total < self.imbalance_min_usd:
+            return []
+        imbalance = (long_usd - short_usd) / total
+        if abs(imbalance) < self.imbalance_threshold:
+            return []
+        alert = self._alert("trade_imbalance", symbol, self.imbalance_window, now, {
+            "usd": total,
+            "long_usd": long_usd,
+            "short_usd": short_usd,
+            "imbalance": imbalance,
+            "side": "long" if imbalance > 0 else "short",
+            "threshold": self.imbalance_threshold,
+        })
+        return [alert] if alert else []
+
+    def _alert(self, kind, symbol, window, now, fields):
+        key = (kind, symbol, window)
+        if now - self._last_alert.get(key, float("-inf")) < self.cooldown:
+            return None
+        self._last_alert[key] = now
+        alert = {"type": kind, "symbol": symbol, "window": window, "timestamp": now, **fields}
+        for publisher in self.publishers:
+            try:
+                publisher(alert)
+            except Exception as e:
+                print(f"Error publishing {kind} alert for {symbol}: {e}")
+        return alert
+
+
+class RedisAlertPublisher:
+    """Publishes alerts as JSON on a Redis pub/sub channel."""
+
+    def __init__(self, client=None, channel=None):
+        self._client = client
+        self.channel = channel or settings.CASCADE_ALERT_CHANNEL
+
+    def __call__(self, alert):
+        client = self._client or get_redis_client()
+        client.publish(self.channel, json.dumps(alert))
+
+
+class AlertSubscriber:
+    """Calls ``callback(alert)`` from a background thread for every alert on the channel."""
+
+    def __init__(self, callback, client=None, channel=None):
+        self.callback = callback
+        self._client = client
+        self.channel = channel or settings.CASCADE_ALERT_CHANNEL
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="alert-subscriber", daemon=True)
+            self._thread.start()
+        return self
+
+    def _run(self):
+        while True:
+            pubsub = None
+            try:
+                pubsub = (self._client or get_redis_client()).pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(self.channel)
+                while True:
+                    # get_message() statt listen(): der gemeinsame Pool hat ein socket_timeout
+                    message = pubsub.get_message(timeout=1.0)
+                    if message is None:
+                        continue
+                    try:
+                        self.callback(json.loads(message['data']))
+                    except Exception as e:
+                        print(f"Error handling alert {message}: {e}")
+            except Exception as e:
+                print(f"Alert subscription error: {e}. Reconnecting...")
+            finally:
+                # Verbindung an den Pool zurückgeben, sonst leckt jeder Reconnect eine Verbindung
+                if pubsub is not None:
+                    try:
+                        pubsub.close()
+                    except Exception as e:
+                        print(f"Error closing alert subscription: {e}")
+            time.sleep(5)
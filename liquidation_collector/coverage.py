@@ -0,0 +1,30 @@
+"""
+Per-stream connection coverage.
+
+A bucket is complete only if its stream was connected for the whole bucket
+interval. Any disconnect inside the interval (or a stream that has not
+connected yet) marks the bucket as incomplete.
+"""
+import time
+
+
+class StreamCoverage:
+    """Remembers since when each stream has been continuously connected."""
+
+    def __init__(self, clock=time.time):
+        self._clock = clock
+        self._connected_since = {}
+
+    def mark_connected(self, stream, now=None):
+        self._connected_since[stream] = self._clock() if now is None else now
+
+    def mark_disconnected(self, stream):
+        self._connected_since.pop(stream, None)
+
+    def is_connected(self, stream):
+        return stream in self._connected_since
+
+    def is_complete(self, stream, start):
+        """True if ``stream`` has been connected without interruption since ``start``."""
+        since = self._connected_since.get(stream)
+        return since is not None and since <= start
@@ -0,0 +1,97 @@
+"""
+Embedded single-process mode.
+
+Runs the ``Collector`` in a background thread of the Freqtrade process. Buckets
+go straight into per-symbol ``RingBuffer``s that the strategy reads as NumPy
+views, and CSV persistence happens on a separate writer thread. No Redis and
+no csv_writer service are involved.
+"""
+import asyncio
+import threading
+
+from . import settings
+from .cascade import CascadeDetector
+from .loader import seed_ring_buffers
+from .persistence import CsvSink
+from .ring_buffer import RingBufferStore
+from .sinks import RingBufferSink
+from .streams import Collector
+
+
+class EmbeddedCollector:
+    """Owns the ring buffers, the CSV writer thread and the collector thread."""
+
+    def __init__(self, csv_file_path=None, pairlist=None, capacity=None,
+                 ring_buffer_dir=None, persist_csv=True):
+        self.pairlist = list(pairlist if pairlist is not None else settings.PAIRLIST)
+        self.csv_file_path = csv_file_path or settings.CSV_FILE_PATH
+        self.store = RingBufferStore(
+            capacity or settings.RING_BUFFER_CAPACITY,
+            directory=ring_buffer_dir or settings.RING_BUFFER_DIR
+        )
+        self.csv_sink = CsvSink(self.csv_file_path) if persist_csv else None
+        sinks = [RingBufferSink(self.store)]
+        if self.csv_sink is not None:
+            sinks.append(self.csv_sink)
+        # Alerts gehen direkt an registrierte Callbacks, ohne Redis
+        self.detector = CascadeDetector()
+        self.collector = Collector(sinks, pairlist=self.pairlist, detector=self.detector)
+        self._thread = None
+        self._loop = None
+        self._task = None
+
+    def start(self):
+        """Seed the ring buffers from the CSV file and start the collector thread."""
+        if self._thread is not None:
+            return self
+        try:
+            seed_ring_buffers(self.store, self.csv_file_path, self.collector.aggregator.symbols)
+        except Exception as e:
+            print(f"Could not seed ring buffers from {self.csv_file_path}: {e}")
+        if self.csv_sink is not None:
+            self.csv_sink.start()
+        self._thread = threading.Thread(target=self._run, name="liquidation-collector", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._loop is not None and self._task is not None:
+            self._loop.call_soon_threadsafe(self._task.cancel)
+        if self._thread is not None:
+            self._thread.join(timeout=10)
+            self._thread = None
+        if self.csv_sink is not None:
+            self.csv_sink.stop()
+        self.store.flush()
+
+    def _run(self):
+        self._loop = asyncio.new_event_loop()
+        try:
+            self._task = self._loop.create_task(self.collector.run())
+            self._loop.run_until_complete(self._task)
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            print(f"Embedded collector stopped: {e}")
+        finally:
+            self._loop.close()
+
+    def ring_buffer(self, symbol):
+        return self.store.get(symbol)
+
+    def add_alert_callback(self, callback):
+        """Call ``callback(alert)`` from the collector thread for every cascade alert."""
+        self.detector.publishers.append(callback)
+
+
+_embedded = None
+_embedded_lock = threading.Lock()
+
+
+def start_embedded(**kwargs):
+    """Start the process-wide ``EmbeddedCollector`` once and return it."""
+    global _embedded
+    with _embedded_lock:
+        if _embedded is None:
+            _embedded = EmbeddedCollector(**kwargs).start()
+        return _embedded
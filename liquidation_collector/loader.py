@@ -0,0 +1,219 @@
+"""
+Loading of the collected data into a Freqtrade dataframe.
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+from . import settings
+from .persistence import CSV_HEADER, TIMESTAMP_FORMAT, seek_timestamp
+
+DATA_COLUMNS = CSV_HEADER[2:]
+
+
+# Kompakte Datentypen: int32-Zähler (nullable wegen unvollständiger Buckets), float32-Größen.
+# funding_rate bleibt float64, float32 würde 0.0001 zu 9.99999975e-05 verfälschen.
+CSV_DTYPES = {
+    'symbol': 'category',
+    'timestamp': 'str',
+    'liq_long_count': 'Int32', 'liq_short_count': 'Int32',
+    'liq_long_usd_size': 'float32', 'liq_short_usd_size': 'float32',
+    'trade_long_count': 'Int32', 'trade_short_count': 'Int32',
+    'trade_long_usd_size': 'float32', 'trade_short_usd_size': 'float32',
+    'funding_rate': 'float64',
+}
+CSV_CHUNKSIZE = 50_000
+
+
+def _to_timestamp_string(since):
+    since = pd.Timestamp(since)
+    if since.tzinfo is not None:
+        since = since.tz_convert('UTC').tz_localize(None)
+    return since.strftime(TIMESTAMP_FORMAT)
+
+
+def read_csv_rows(csv_file_path, symbols, since=None, chunksize=CSV_CHUNKSIZE):
+    """
+    Stream the CSV file in chunks and keep only rows of ``symbols`` with a
+    timestamp >= ``since``. With ``since`` the reader first seeks close to it,
+    so time and memory depend on the window, not on the size of the file.
+    """
+    with open(csv_file_path, 'rb') as file:
+        header = file.readline().decode('utf-8').strip().split(',')
+        # Sicherstellen, dass die Spalte 'timestamp' existiert
+        if 'timestamp' not in header:
+            raise KeyError("Die Spalte 'timestamp' fehlt in der CSV-Datei.")
+
+        since_str = None
+        if since is not None:
+            since_str = _to_timestamp_string(since)
+            seek_since = _to_timestamp_string(
+                pd.Timestamp(since_str) - pd.Timedelta(minutes=settings.BACKFILL_MAX_AGE_MINUTES)
+            )
+            file.seek(seek_timestamp(file, seek_since, file.tell()))
+
+        reader = pd.read_csv(
+            file, header=None, names=header, chunksize=chunksize,
+            dtype={col: dtype for col, dtype in CSV_DTYPES.items() if col in header}
+        )
+        chunks = []
+        for chunk in reader:
+            mask = chunk['symbol'].isin(symbols)
+            if since_str is not None:
+                mask &= chunk['timestamp'] >= since_str
+            if mask.any():
+                chunks.append(chunk[mask])
+
+    if not chunks:
+        return pd.DataFrame({col: pd.Series(dtype=CSV_DTYPES.get(col, 'float64')) for col in header})
+    rows = pd.concat(chunks, ignore_index=True)
+    rows['symbol'] = rows['symbol'].astype('category').cat.remove_unused_categories()
+    return rows
+
+
+def load_historical_data(csv_file_path, symbol, since=None):
+    """
+    Load the rows of ``symbol`` from the CSV file with minute-floored UTC timestamps.
+    With ``since`` only rows from that time on are read (see ``read_csv_rows``).
+    Returns ``None`` if the file does not exist or is not readable.
+    """
+    if not os.path.exists(csv_file_path):
+        print(f"CSV-Datei {csv_file_path} nicht gefunden. Historische Daten werden übersprungen.")
+        return None
+    if not os.access(csv_file_path, os.R_OK):
+        print(f"Keine Leseberechtigung für die Datei: {csv_file_path}")
+        return None
+
+    print(f"Lade historische Daten aus {csv_file_path}...")
+    historical_data = read_csv_rows(csv_file_path, [symbol], since=since)
+
+    # Sicherstellen, dass der Timestamp als Datumsformat vorliegt
+    historical_data['timestamp'] = pd.to_datetime(
+        historical_data['timestamp'], format=TIMESTAMP_FORMAT, errors='coerce'
+    )
+    if historical_data['timestamp'].isnull().any():
+        raise ValueError("Ungültige Werte in der Spalte 'timestamp' in der CSV-Datei.")
+
+    # Runden der Timestamps auf die Minute und Zeitzoneninformation hinzufügen (UTC)
+    historical_data['timestamp'] = historical_data['timestamp'].dt.floor('min').dt.tz_localize('UTC')
+    return historical_data
+
+
+def merge_historical_data(dataframe, historical_data, since=None):
+    """
+    Map the historical columns onto ``dataframe`` by candle date. Candles before
+    ``since`` were not loaded and are set to NaN.
+    """
+    # Sicherstellen, dass die Spalte 'date' im DataFrame als Datumsformat vorliegt
+    if 'date' in dataframe.columns:
+        dataframe['date'] = pd.to_datetime(dataframe['date'], errors='coerce')
+        if dataframe['date'].isnull().any():
+            raise ValueError("Ungültige Werte in der Spalte 'date' im DataFrame.")
+
+        # Runden der Timestamps auf die Minute
+        dataframe['date'] = dataframe['date'].dt.floor('min')
+
+    # Überprüfen, ob es Übereinstimmungen gibt
+    common_timestamps = set(dataframe['date']).intersection(set(historical_data['timestamp']))
+    if not common_timestamps:
+        print("Warnung: Keine gemeinsamen Timestamps zwischen dataframe und historical_data gefunden!")
+        print("Timestamps im dataframe (date):", dataframe['date'].unique())
+        print("Timestamps in historical_data:", historical_data['timestamp'].unique())
+
+    # Nachträglich gefüllte Buckets stehen später in der Datei: die letzte Zeile gewinnt
+    indexed = historical_data.drop_duplicates('timestamp', keep='last').set_index('timestamp')
+    present = dataframe['date'].isin(indexed.index)
+    for col in DATA_COLUMNS:
+        if col in indexed.columns:
+            # Werte basierend auf dem Timestamp übernehmen. Minuten ohne Zeile waren ruhig (0.0),
+            # leere Felder markieren unvollständige Buckets und bleiben NaN.
+            dataframe[col] = dataframe['date'].map(indexed[col]).astype('float64').where(present, 0.0)
+        else:
+            dataframe[col] = 0.0  # Falls die Spalte fehlt, mit 0.0 auffüllen
+        if since is not None:
+            dataframe.loc[dataframe['date'] < since, col] = np.nan
+    return dataframe
+
+
+def _decode(data, key, cast):
+    if data.get(b'complete', b'1') == b'0':
+        return np.nan
+    return cast(data.get(key, b'0').decode('utf-8'))
+
+
+def apply_latest_from_redis(dataframe, client, symbol):
+    """Write the most recent Redis aggregates and funding rate into the last row."""
+    last = dataframe.index[-1]
+
+    liquidation_data = client.hgetall(f"liquidation:{symbol}")
+    trade_data = client.hgetall(f"large_trade:{symbol}")
+    funding_data = client.hgetall(f"funding_rate:{symbol}")
+
+    for prefix, data in (('liq', liquidation_data), ('trade', trade_data)):
+        dataframe.loc[last, f'{prefix}_long_count'] = _decode(data, b'long_count', int) if data else 0
+        dataframe.loc[last, f'{prefix}_short_count'] = _decode(data, b'short_count', int) if data else 0
+        dataframe.loc[last, f'{prefix}_long_usd_size'] = _decode(data, b'long_usd_size', float) if data else 0.0
+        dataframe.loc[last, f'{prefix}_short_usd_size'] = _decode(data, b'short_usd_size', float) if data else 0.0
+
+    dataframe.loc[last, 'funding_rate'] = _decode(funding_data, b'funding_rate', float) if funding_data else 0.0
+    return dataframe
+
+
+def merge_ring_buffer(dataframe, ring_buffer):
+    """
+    Map the ring buffer rows onto ``dataframe`` by candle date. The collector
+    writes a row for every symbol each minute, so candles without a row have no
+    data and are NaN. The last row gets the most recent bucket, like
+    ``apply_latest_from_redis`` does in Redis mode.
+    """
+    timestamps, values = ring_buffer.latest()
+    dates = pd.to_datetime(dataframe['date'], utc=True).dt.floor('min')
+    epochs = (dates - pd.Timestamp(0, tz='UTC')) // pd.Timedelta(seconds=1)
+    epochs = epochs.to_numpy(dtype=np.int64)
+
+    if len(timestamps) == 0:
+        for col in DATA_COLUMNS:
+            dataframe[col] = np.nan
+        return dataframe
+
+    positions = np.minimum(np.searchsorted(timestamps, epochs), len(timestamps) - 1)
+    found = timestamps[positions] == epochs
+    for j, col in enumerate(DATA_COLUMNS):
+        dataframe[col] = np.where(found, values[positions, j], np.nan)
+
+    last = dataframe.index[-1]
+    for j, col in enumerate(DATA_COLUMNS):
+        dataframe.loc[last, col] = values[-1, j]
+    return dataframe
+
+
+def seed_ring_buffers(store, csv_file_path, symbols):
+    """
+    Fill empty ring buffers with the most recent CSV rows, e.g. after a restart.
+    The CSV writers skip quiet minutes, so minutes between two CSV rows are
+    seeded as zeros; only the time before the first and after the last row
+    stays missing (NaN in ``merge_ring_buffer``).
+    """
+    if not os.path.exists(csv_file_path):
+        return
+    since = pd.Timestamp.now('UTC') - pd.Timedelta(minutes=store.capacity)
+    data = read_csv_rows(csv_file_path, symbols, since=since)
+    if data.empty:
+        return
+    timestamps = pd.to_datetime(data['timestamp'], format=TIMESTAMP_FORMAT, errors='coerce').dt.floor('min')
+    data = data.assign(epoch=(timestamps - pd.Timestamp(0)) // pd.Timedelta(seconds=1))
+    data = data[timestamps.notna()]
+
+    for symbol, rows in data.groupby('symbol', observed=True):
+        ring_buffer = store.get(symbol)
+        if ring_buffer.count:
+            continue
+        rows = rows.sort_values('epoch', kind='stable').drop_duplicates('epoch', keep='last')
+        values = rows.set_index('epoch')[DATA_COLUMNS].astype('float64')
+        # Ruhige Minuten ohne CSV-Zeile mit 0 auffüllen; leere Felder (Lücken) bleiben NaN
+        minutes = np.arange(values.index[0], values.index[-1] + 60, 60)
+        values = values.reindex(minutes, fill_value=0.0).tail(store.capacity)
+        for epoch, row in zip(values.index.to_numpy(), values.to_numpy()):
+            ring_buffer.append(epoch, row)
+        print(f"Seeded ring buffer for {symbol} with {len(rows)} rows ({len(values)} minutes) from {csv_file_path}")
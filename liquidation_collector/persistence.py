@@ -0,0 +1,351 @@
+"""
+CSV persistence of the per-minute aggregates.
+"""
+import csv
+import json
+import math
+import os
+import queue
+import shutil
+import threading
+import time
+from datetime import datetime, timedelta
+
+from . import settings
+from .redis_client import check_connection, get_redis_client
+
+CSV_HEADER = [
+    'symbol', 'timestamp',
+    'liq_long_count', 'liq_short_count', 'liq_long_usd_size', 'liq_short_usd_size',
+    'trade_long_count', 'trade_short_count', 'trade_long_usd_size', 'trade_short_usd_size',
+    'funding_rate'
+]
+
+_COUNT_KEYS = [b'long_count', b'short_count', b'long_usd_size', b'short_usd_size']
+
+# Redis list with backfilled rows, drained by the CsvWriter
+BACKFILL_KEY = "backfill"
+
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+COMPACTION_INTERVAL = 3600
+
+
+def safe_decode_float(data_dict, key, default='0'):
+    try:
+        return float(data_dict.get(key, default.encode()).decode('utf-8'))
+    except (ValueError, AttributeError):
+        return 0.0
+
+
+def safe_decode_int(data_dict, key, default='0'):
+    try:
+        return int(data_dict.get(key, default.encode()).decode('utf-8'))
+    except (ValueError, AttributeError):
+        return 0
+
+
+def safe_decode_str(data_dict, key, default=''):
+    try:
+        return data_dict.get(key, default.encode()).decode('utf-8')
+    except AttributeError:
+        return default
+
+
+def is_incomplete(data):
+    """True if a Redis hash belongs to a bucket during which its stream was disconnected."""
+    return bool(data) and data.get(b'complete', b'1') == b'0'
+
+
+def has_meaningful_data(liquidation_data, trade_data, funding_data):
+    """
+    Only write if we have meaningful data (not just empty or zero values).
+    Incomplete buckets are always written so the gap stays visible.
+    """
+    return bool(
+        (liquidation_data and any(safe_decode_float(liquidation_data, k) > 0 for k in _COUNT_KEYS)) or
+        (trade_data and any(safe_decode_float(trade_data, k) > 0 for k in _COUNT_KEYS)) or
+        (funding_data and funding_data.get(b'funding_rate')) or
+        is_incomplete(liquidation_data) or is_incomplete(trade_data)
+    )
+
+
+def _decode_side(data):
+    # Unvollständige Buckets werden als leere Felder geschrieben (NaN beim Einlesen)
+    if is_incomplete(data):
+        return ['', '', '', '']
+    return [
+        safe_decode_int(data, b'long_count'),
+        safe_decode_int(data, b'short_count'),
+        safe_decode_float(data, b'long_usd_size'),
+        safe_decode_float(data, b'short_usd_size'),
+    ]
+
+
+def build_row(symbol, liquidation_data, trade_data, funding_data):
+    """Build one CSV row from the raw Redis hashes of a symbol."""
+    return (
+        [symbol, safe_decode_str(liquidation_data, b'timestamp') or safe_decode_str(trade_data, b'timestamp')] +
+        _decode_side(liquidation_data) +
+        _decode_side(trade_data) +
+        [safe_decode_float(funding_data, b'funding_rate')]
+    )
+
+
+def _bucket_values(bucket):
+    if not bucket.get("complete", 1):
+        return [math.nan] * 4
+    return [bucket["long_count"], bucket["short_count"], bucket["long_usd_size"], bucket["short_usd_size"]]
+
+
+def aggregates_to_values(liquidation_data, trade_data, funding_rate):
+    """
+    Flatten one symbol's flushed buckets into the data columns of a CSV row.
+    The columns of an incomplete bucket are NaN.
+    """
+    return _bucket_values(liquidation_data) + _bucket_values(trade_data) + [funding_rate]
+
+
+def values_to_row(symbol, timestamp, values):
+    """Build a CSV row from ``aggregates_to_values()`` output, NaN becomes an empty field."""
+    return [symbol, timestamp] + ['' if isinstance(v, float) and math.isnan(v) else v for v in values]
+
+
+def open_csv(csv_file_path):
+    """Open the CSV file in append mode, creating the directory and header if needed."""
+    csv_dir = os.path.dirname(csv_file_path)
+
+    # Verzeichnis erstellen, falls es nicht existiert
+    if csv_dir and not os.path.exists(csv_dir):
+        print(f"Directory {csv_dir} does not exist. Creating it...")
+        os.makedirs(csv_dir)
+
+    file_exists = os.path.exists(csv_file_path)
+    file = open(csv_file_path, mode='a', newline='')
+    print(f"CSV file opened for writing at {csv_file_path}...")
+
+    # Schreibe Header nur, wenn die Datei noch nicht existiert
+    if not file_exists:
+        csv.writer(file).writerow(CSV_HEADER)
+        file.flush()
+        print("CSV header written...")
+    else:
+        print("CSV file already exists. Header not written.")
+    return file
+
+
+def _line_timestamp(line):
+    try:
+        return line.split(b',', 2)[1].decode('utf-8')
+    except (IndexError, UnicodeDecodeError):
+        return None
+
+
+def seek_timestamp(file, since, data_start, block_size=1 << 16):
+    """
+    Return the offset of a line in the binary ``file`` such that no row before it
+    has a timestamp >= ``since`` (a ``%Y-%m-%d %H:%M:%S`` string).
+
+    Rows are appended in time order, so this is a binary search over byte offsets
+    and reads only a few lines. Backfilled rows are appended late with an older
+    timestamp; callers pass ``since`` minus the maximum backfill age so such
+    rows cannot hide newer ones.
+    """
+    lo, hi = data_start, file.seek(0, os.SEEK_END)
+    while hi - lo > block_size:
+        mid = (lo + hi) // 2
+        file.seek(mid)
+        file.readline()  # Angeschnittene Zeile überspringen
+        timestamp = _line_timestamp(file.readline())
+        if timestamp is None or timestamp >= since:
+            hi = mid
+        else:
+            lo = mid
+    if lo == data_start:
+        return lo
+    file.seek(lo)
+    file.readline()
+    return file.tell()
+
+
+def compact_csv(csv_file_path, retention_days, now=None):
+    """
+    Drop rows older than ``retention_days`` by copying the rest to a new file and
+    replacing the old one. Runs in constant memory; writers must reopen the file.
+    """
+    if not retention_days or not os.path.exists(csv_file_path):
+        return False
+    now = now or datetime.utcnow()
+    margin = timedelta(days=retention_days, minutes=settings.BACKFILL_MAX_AGE_MINUTES)
+    cutoff = (now - margin).strftime(TIMESTAMP_FORMAT)
+
+    with open(csv_file_path, 'rb') as src:
+        header = src.readline()
+        offset = seek_timestamp(src, cutoff, src.tell())
+        if offset == len(header):
+            return False
+        tmp_path = f"{csv_file_path}.tmp"
+        with open(tmp_path, 'wb') as dst:
+            dst.write(header)
+            src.seek(offset)
+            shutil.copyfileobj(src, dst)
+    os.replace(tmp_path, csv_file_path)
+    print(f"Compacted {csv_file_path}: dropped {offset - len(header)} bytes older than {cutoff}")
+    return True
+
+
+class CsvSink:
+    """
+    Appends flushed aggregates to the CSV file from a background thread, so the
+    collector never blocks on disk I/O. Used by the embedded mode instead of
+    polling Redis.
+    """
+
+    def __init__(self, csv_file_path=None, max_pending=1000, retention_days=None):
+        self.csv_file_path = csv_file_path or settings.CSV_FILE_PATH
+        self.retention_days = retention_days if retention_days is not None else settings.CSV_RETENTION_DAYS
+        self.funding_rates = {}
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="csv-sink", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+
+    def write_aggregates(self, timestamp, liquidations, trades):
+        rows = []
+        for symbol in liquidations:
+            funding_rate = self.funding_rates.get(symbol, 0.0)
+            values = aggregates_to_values(liquidations[symbol], trades[symbol], funding_rate)
+            # Only write if we have meaningful data; incomplete (NaN) buckets are always written
+            if any(math.isnan(value) or value > 0 for value in values[:-1]) or funding_rate:
+                rows.append(values_to_row(symbol, timestamp, values))
+        self._put(timestamp, rows)
+
+    def write_backfill(self, timestamp, liquidations, trades):
+        """Append replacement rows; the loader keeps the last row per timestamp."""
+        self._put(timestamp, [
+            values_to_row(symbol, timestamp, aggregates_to_values(
+                liquidations[symbol], trades[symbol], self.funding_rates.get(symbol, 0.0)
+            ))
+            for symbol in liquidations
+        ])
+
+    def _put(self, timestamp, rows):
+        try:
+            self._queue.put_nowait(rows)
+        except queue.Full:
+            print(f"CSV queue full, dropping {len(rows)} rows for {timestamp}")
+
+    def write_funding_rates(self, timestamp, funding_rates):
+        self.funding_rates.update(funding_rates)
+
+    def _run(self):
+        running = True
+        while running:
+            compact_at = time.time() + COMPACTION_INTERVAL if self.retention_days else None
+            with open_csv(self.csv_file_path) as file:
+                writer = csv.writer(file)
+                while True:
+                    try:
+                        timeout = None if compact_at is None else max(0.0, compact_at - time.time())
+                        rows = self._queue.get(timeout=timeout)
+                    except queue.Empty:
+                        break
+                    if rows is None:
+                        running = False
+                        break
+                    try:
+                        writer.writerows(rows)
+                        file.flush()
+                    except Exception as e:
+                        print(f"Error writing CSV rows: {e}")
+            if running:
+                try:
+                    compact_csv(self.csv_file_path, self.retention_days)
+                except Exception as e:
+                    print(f"Error compacting {self.csv_file_path}: {e}")
+
+
+class CsvWriter:
+    """Polls the latest aggregates from Redis once per minute and appends them to a CSV file."""
+
+    def __init__(self, csv_file_path=None, client=None, pairlist=None, retention_days=None):
+        self.csv_file_path = csv_file_path or settings.CSV_FILE_PATH
+        self.retention_days = retention_days if retention_days is not None else settings.CSV_RETENTION_DAYS
+        self._client = client
+        self.pairlist = list(pairlist if pairlist is not None else settings.PAIRLIST)
+
+    @property
+    def client(self):
+        if self._client is None:
+            self._client = get_redis_client()
+        return self._client
+
+    def write_once(self, writer):
+        """Read the current Redis hashes for every pair and append the meaningful ones."""
+        for pair in self.pairlist:
+            symbol = pair.replace("/", "")
+
+            liquidation_data = self.client.hgetall(f"liquidation:{symbol}")
+            trade_data = self.client.hgetall(f"large_trade:{symbol}")
+            funding_data = self.client.hgetall(f"funding_rate:{symbol}")
+
+            print(f"Checking data for {symbol}...")
+            print(f"Liquidation data: {liquidation_data}")
+            print(f"Trade data: {trade_data}")
+            print(f"Funding data: {funding_data}")
+
+            if has_meaningful_data(liquidation_data, trade_data, funding_data):
+                try:
+                    print(f"Writing data for {symbol} to CSV...")
+                    writer.writerow(build_row(symbol, liquidation_data, trade_data, funding_data))
+                    print(f"Data for {symbol} written to CSV.")
+                except Exception as e:
+                    print(f"Error writing data for {symbol}: {e}")
+            else:
+                print(f"No meaningful data for {symbol} to write to CSV.")
+
+        # Nachträglich gefüllte Buckets (Gap-Fill) anhängen
+        while True:
+            row = self.client.lpop(BACKFILL_KEY)
+            if row is None:
+                break
+            try:
+                writer.writerow(json.loads(row))
+            except Exception as e:
+                print(f"Error writing backfill row {row}: {e}")
+
+    def run(self):
+        """Write rows forever, synchronized to the minute boundary."""
+        print("CSV Writer started...")
+        while True:
+            compact_at = time.time() + COMPACTION_INTERVAL
+            with open_csv(self.csv_file_path) as file:
+                writer = csv.writer(file)
+                while not self.retention_days or time.time() < compact_at:
+                    self.write_once(writer)
+                    file.flush()
+
+                    # Wait for next minute boundary to synchronize with aggregation
+                    current_time = time.time()
+                    seconds_until_next_minute = 60 - (current_time % 60)
+                    print(f"Sleeping for {seconds_until_next_minute:.1f} seconds until next minute...")
+                    time.sleep(seconds_until_next_minute)
+            try:
+                compact_csv(self.csv_file_path, self.retention_days)
+            except Exception as e:
+                print(f"Error compacting {self.csv_file_path}: {e}")
+
+
+def start(client=None, csv_file_path=None):
+    """Run the CSV writer as a standalone service (blocks forever)."""
+    client = check_connection(client)
+    CsvWriter(csv_file_path=csv_file_path, client=client).run()
@@ -0,0 +1,54 @@
+"""
+Lazily created Redis connections.
+
+Importing this module does not connect anywhere. The connection pool is built
+on the first call to ``get_redis_client()``; ``set_redis_client()`` injects a
+custom client instead (e.g. a fake for tests or an existing connection).
+"""
+import threading
+
+import redis
+
+from . import settings
+
+_lock = threading.Lock()
+_pool = None
+_client = None
+
+
+def get_connection_pool():
+    """Return the shared connection pool, creating it on first use."""
+    global _pool
+    with _lock:
+        if _pool is None:
+            _pool = redis.ConnectionPool(
+                host=settings.REDIS_HOST, port=settings.REDIS_PORT, db=settings.REDIS_DB,
+                socket_connect_timeout=5, socket_timeout=5
+            )
+        return _pool
+
+
+def get_redis_client():
+    """Return the shared Redis client, creating it on first use."""
+    global _client
+    if _client is None:
+        pool = get_connection_pool()
+        with _lock:
+            if _client is None:
+                _client = redis.StrictRedis(connection_pool=pool)
+    return _client
+
+
+def set_redis_client(client):
+    """Replace the shared client, e.g. with a fake or an already configured client."""
+    global _client
+    with _lock:
+        _client = client
+
+
+def check_connection(client=None):
+    """Ping Redis; raises ``redis.ConnectionError`` if it is not reachable."""
+    client = client or get_redis_client()
+    client.ping()
+    print("Redis connection established successfully")
+    return client
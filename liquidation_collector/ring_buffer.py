@@ -0,0 +1,124 @@
+"""
+Fixed-size ring buffers holding the per-minute buckets of each symbol.
+
+Every row is written twice (at ``i`` and ``i + capacity``), so the most recent
+rows are always one contiguous slice and ``latest()`` can return NumPy views
+without copying. The row counter lives in a header row and is bumped only after
+a row is complete. ``latest()`` returns at most ``capacity - 1`` rows, so the
+slot the next ``append()`` overwrites is never part of a returned window; a
+reader racing with one append still sees complete, sorted rows. ``update()``
+rewrites a row in place and may be observed half-written.
+
+With a ``path`` the buffer is backed by an ``np.memmap`` file and can be read
+from another process (open it with ``readonly=True``).
+"""
+import os
+import threading
+
+import numpy as np
+
+from .persistence import CSV_HEADER
+
+COLUMNS = CSV_HEADER[2:]
+
+_HEADER_COUNT, _HEADER_CAPACITY, _HEADER_COLUMNS = 0, 1, 2
+
+
+class RingBuffer:
+    """Per-symbol buffer of ``(timestamp, values)`` rows, timestamps in epoch seconds."""
+
+    def __init__(self, capacity, path=None, readonly=False):
+        self.capacity = int(capacity)
+        self.width = 1 + len(COLUMNS)
+        shape = (1 + 2 * self.capacity, self.width)
+
+        if path is None:
+            self._data = np.zeros(shape, dtype=np.float64)
+        else:
+            exists = os.path.exists(path)
+            if readonly and not exists:
+                raise FileNotFoundError(path)
+            mode = 'r' if readonly else ('r+' if exists else 'w+')
+            self._data = np.memmap(path, dtype=np.float64, mode=mode, shape=shape)
+
+        header = self._data[0]
+        if header[_HEADER_CAPACITY] == 0 and not readonly:
+            header[_HEADER_CAPACITY] = self.capacity
+            header[_HEADER_COLUMNS] = self.width
+        elif header[_HEADER_CAPACITY] != self.capacity or header[_HEADER_COLUMNS] != self.width:
+            raise ValueError(f"Ring buffer layout mismatch in {path}")
+
+        self._rows = self._data[1:]
+
+    def __len__(self):
+        """Number of rows ``latest()`` can return (the next write slot is excluded)."""
+        return min(self.count, self.capacity - 1)
+
+    @property
+    def count(self):
+        """Total number of rows ever appended."""
+        return int(self._data[0, _HEADER_COUNT])
+
+    def append(self, timestamp, values):
+        """Append one row; ``values`` are ordered like ``COLUMNS``."""
+        count = self.count
+        position = count % self.capacity
+        self._rows[position, 0] = timestamp
+        self._rows[position, 1:] = values
+        self._rows[position + self.capacity] = self._rows[position]
+        self._data[0, _HEADER_COUNT] = count + 1
+
+    def update(self, timestamp, values):
+        """Overwrite the newest row with ``timestamp``; returns False if it is no longer buffered."""
+        timestamps, _ = self.latest()
+        matches = np.flatnonzero(timestamps == timestamp)
+        if len(matches) == 0:
+            return False
+        position = (self.count - len(timestamps) + int(matches[-1])) % self.capacity
+        self._rows[position, 1:] = values
+        self._rows[position + self.capacity] = self._rows[position]
+        return True
+
+    def latest(self, n=None):
+        """
+        Return ``(timestamps, values)`` views of the last ``n`` rows, oldest first,
+        with ``n <= capacity - 1``. The views stay valid until ``capacity - n``
+        further rows have been appended.
+        """
+        count = self.count
+        n = len(self) if n is None else min(int(n), len(self))
+        start = (count - n) % self.capacity
+        window = self._rows[start:start + n]
+        return window[:, 0], window[:, 1:]
+
+    def flush(self):
+        if isinstance(self._data, np.memmap):
+            self._data.flush()
+
+
+class RingBufferStore:
+    """Lazily creates one ``RingBuffer`` per symbol, optionally as files in ``directory``."""
+
+    def __init__(self, capacity, directory=None, readonly=False):
+        self.capacity = capacity
+        self.directory = directory
+        self.readonly = readonly
+        self._buffers = {}
+        self._lock = threading.Lock()
+        if directory and not readonly:
+            os.makedirs(directory, exist_ok=True)
+
+    def get(self, symbol):
+        buffer = self._buffers.get(symbol)
+        if buffer is None:
+            with self._lock:
+                buffer = self._buffers.get(symbol)
+                if buffer is None:
+                    path = os.path.join(self.directory, f"{symbol}.ring") if self.directory else None
+                    buffer = RingBuffer(self.capacity, path=path, readonly=self.readonly)
+                    self._buffers[symbol] = buffer
+        return buffer
+
+    def flush(self):
+        for buffer in self._buffers.values():
+            buffer.flush()
@@ -0,0 +1,72 @@
+"""
+Runtime settings for the liquidation collector.
+
+Values come from the shared ``config.py`` when it is importable and can be
+overridden through environment variables.
+"""
+import os
+
+try:
+    import config as _config
+except ImportError:
+    # Fallback to hardcoded values if config import fails
+    print("Warning: Could not import config.py, using fallback values")
+    _config = None
+
+
+def _get(name, default):
+    return getattr(_config, name, default)
+
+
+# Trading pairs to monitor
+PAIRLIST = _get("PAIRLIST", [
+    "BTC/USDT", "ETH/USDT", "XRP/USDT", "SOL/USDT", "LINK/USDT",
+    "ADA/USDT", "TRX/USDT", "BNB/USDT", "SUI/USDT", "HBAR/USDT",
+    "LTC/USDT", "SUSHI/USDT", "UNI/USDT", "AVAX/USDT", "ALGO/USDT",
+    "ETC/USDT", "DOT/USDT", "FIL/USDT", "ARB/USDT", "BCH/USDT",
+    "WLD/USDT", "CRV/USDT", "NEAR/USDT", "XLM/USDT", "SAND/USDT",
+    "AAVE/USDT", "RENDER/USDT", "APT/USDT", "FTM/USDT", "OP/USDT"
+])
+PAIRLIST_SYMBOLS = [pair.replace("/", "") for pair in PAIRLIST]
+
+# Redis configuration
+REDIS_HOST = os.getenv("REDIS_HOST", _get("REDIS_HOST", "redis"))
+REDIS_PORT = int(os.getenv("REDIS_PORT", _get("REDIS_PORT", 6379)))
+REDIS_DB = int(os.getenv("REDIS_DB", _get("REDIS_DB", 0)))
+
+# WebSocket URLs
+LIQUIDATION_URL = _get("LIQUIDATION_URL", "wss://fstream.binance.com/ws/!forceOrder@arr")
+TRADE_URL_TEMPLATE = _get("TRADE_URL_TEMPLATE", "wss://stream.binance.com:9443/ws/{}@aggTrade")
+
+# Binance API URLs
+FUNDING_RATE_URL = _get("FUNDING_RATE_URL", "https://fapi.binance.com/fapi/v1/premiumIndex")
+AGG_TRADES_URL = os.getenv("AGG_TRADES_URL", _get("AGG_TRADES_URL", "https://api.binance.com/api/v3/aggTrades"))
+
+# Gap-fill of missed trade buckets from the REST API
+BACKFILL_CONCURRENCY = int(os.getenv("BACKFILL_CONCURRENCY", _get("BACKFILL_CONCURRENCY", 4)))
+BACKFILL_MAX_AGE_MINUTES = int(os.getenv("BACKFILL_MAX_AGE_MINUTES", _get("BACKFILL_MAX_AGE_MINUTES", 1440)))
+
+# Aggregation settings
+AGGREGATION_INTERVAL_MINUTES = _get("AGGREGATION_INTERVAL_MINUTES", 1)
+LARGE_TRADE_THRESHOLD_USD = _get("LARGE_TRADE_THRESHOLD_USD", 10000)
+
+# Embedded mode: per-symbol ring buffer of one-minute buckets
+RING_BUFFER_CAPACITY = int(os.getenv("RING_BUFFER_CAPACITY", _get("RING_BUFFER_CAPACITY", 1440)))
+RING_BUFFER_DIR = os.getenv("RING_BUFFER_DIR", _get("RING_BUFFER_DIR", None))
+
+# CSV retention: rows older than this are dropped by the writer (0 = keep everything)
+CSV_RETENTION_DAYS = float(os.getenv("CSV_RETENTION_DAYS", _get("CSV_RETENTION_DAYS", 0)))
+
+# Liquidation cascade alerts (sub-minute, published via Redis pub/sub)
+CASCADE_ALERT_CHANNEL = os.getenv("CASCADE_ALERT_CHANNEL", _get("CASCADE_ALERT_CHANNEL", "liquidation_alerts"))
+CASCADE_THRESHOLDS_USD = _get("CASCADE_THRESHOLDS_USD", {5: 250000, 15: 500000, 60: 1000000})
+IMBALANCE_WINDOW_SECONDS = _get("IMBALANCE_WINDOW_SECONDS", 15)
+IMBALANCE_THRESHOLD = _get("IMBALANCE_THRESHOLD", 0.8)
+IMBALANCE_MIN_USD = _get("IMBALANCE_MIN_USD", 1000000)
+ALERT_COOLDOWN_SECONDS = _get("ALERT_COOLDOWN_SECONDS", 30)
+
+# File paths
+CSV_FILE_PATH = os.getenv(
+    "CSV_FILE_PATH",
+    _get("DEFAULT_CSV_PATH", "/home/olav/freqtrade_redis_ws/freqtrade/user_data/strategies/market_data.csv")
+)
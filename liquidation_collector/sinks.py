@@ -0,0 +1,88 @@
+"""
+Destinations for flushed aggregates and funding rates.
+
+A sink implements ``write_aggregates(timestamp, liquidations, trades)``,
+``write_backfill(timestamp, liquidations, trades)`` (replaces an earlier,
+incomplete bucket with the same timestamp) and
+``write_funding_rates(timestamp, funding_rates)``.
+"""
+import json
+from datetime import datetime, timezone
+
+from .persistence import BACKFILL_KEY, aggregates_to_values, values_to_row
+from .redis_client import get_redis_client
+
+
+def timestamp_to_minute(timestamp):
+    """Convert a ``%Y-%m-%d %H:%M:%S`` UTC string to epoch seconds floored to the minute."""
+    epoch = datetime.strptime(timestamp, "%Y-%m-%d %H:%M:%S").replace(tzinfo=timezone.utc).timestamp()
+    return int(epoch // 60 * 60)
+
+
+class RedisSink:
+    """Stores the latest bucket per symbol in Redis hashes (read by csv_writer and the strategy)."""
+
+    def __init__(self, client=None):
+        self._client = client
+        self.funding_rates = {}
+
+    @property
+    def client(self):
+        if self._client is None:
+            self._client = get_redis_client()
+        return self._client
+
+    def write_aggregates(self, timestamp, liquidations, trades):
+        pipe = self.client.pipeline(transaction=False)
+        for symbol, data in liquidations.items():
+            pipe.hset(f"liquidation:{symbol}", mapping={"timestamp": timestamp, **data})
+        for symbol, data in trades.items():
+            pipe.hset(f"large_trade:{symbol}", mapping={"timestamp": timestamp, **data})
+        pipe.execute()
+
+    def write_backfill(self, timestamp, liquidations, trades):
+        # Die Hashes enthalten bereits neuere Buckets, daher gehen die Zeilen direkt an den csv_writer
+        pipe = self.client.pipeline(transaction=False)
+        for symbol in liquidations:
+            values = aggregates_to_values(
+                liquidations[symbol], trades[symbol], self.funding_rates.get(symbol, 0.0)
+            )
+            pipe.rpush(BACKFILL_KEY, json.dumps(values_to_row(symbol, timestamp, values)))
+        pipe.execute()
+
+    def write_funding_rates(self, timestamp, funding_rates):
+        self.funding_rates.update(funding_rates)
+        pipe = self.client.pipeline(transaction=False)
+        for symbol, rate in funding_rates.items():
+            pipe.hset(f"funding_rate:{symbol}", mapping={
+                "funding_rate": rate,
+                "timestamp": timestamp
+            })
+        pipe.execute()
+
+
+class RingBufferSink:
+    """Appends every flushed bucket to the per-symbol ring buffers of a ``RingBufferStore``."""
+
+    def __init__(self, store):
+        self.store = store
+        self.funding_rates = {}
+
+    def write_aggregates(self, timestamp, liquidations, trades):
+        minute = timestamp_to_minute(timestamp)
+        for symbol in liquidations:
+            values = aggregates_to_values(
+                liquidations[symbol], trades[symbol], self.funding_rates.get(symbol, 0.0)
+            )
+            self.store.get(symbol).append(minute, values)
+
+    def write_backfill(self, timestamp, liquidations, trades):
+        minute = timestamp_to_minute(timestamp)
+        for symbol in liquidations:
+            values = aggregates_to_values(
+                liquidations[symbol], trades[symbol], self.funding_rates.get(symbol, 0.0)
+            )
+            self.store.get(symbol).update(minute, values)
+
+    def write_funding_rates(self, timestamp, funding_rates):
+        self.funding_rates.update(funding_rates)
@@ -0,0 +1,236 @@
+"""
+Binance WebSocket ingestion.
+
+``Collector`` wires the liquidation and trade streams into an ``Aggregator``
+and flushes the buckets to one or more sinks every aggregation interval.
+Each bucket carries a ``complete`` flag that is 0 if its stream was not
+connected for the whole interval; incomplete trade buckets are refilled
+from REST by the ``Backfiller``.
+Nothing is started on import; call ``start()`` (blocking) or await
+``Collector.run()`` from an existing event loop.
+"""
+import asyncio
+import json
+import time
+from datetime import datetime, timedelta
+
+import requests
+from websockets import connect
+from websockets.exceptions import ConnectionClosed
+
+from . import settings
+from .aggregator import Aggregator
+from .backfill import Backfiller
+from .cascade import CascadeDetector, RedisAlertPublisher
+from .coverage import StreamCoverage
+from .redis_client import check_connection
+from .sinks import RedisSink
+
+
+def fetch_funding_rates(url=None):
+    """
+    Fetch the current funding rates from Binance.
+    """
+    url = url or settings.FUNDING_RATE_URL
+    max_retries = 3
+    for attempt in range(max_retries):
+        try:
+            response = requests.get(url, timeout=10)
+            if response.status_code == 200:
+                data = response.json()
+                funding_rates = {}
+                for item in data:
+                    symbol = item['symbol']
+                    funding_rate = float(item['lastFundingRate'])
+                    funding_rates[symbol] = funding_rate
+                return funding_rates
+            else:
+                print(f"Error fetching funding rates: HTTP {response.status_code}")
+        except requests.exceptions.RequestException as e:
+            print(f"Request failed (attempt {attempt + 1}/{max_retries}): {e}")
+            if attempt < max_retries - 1:
+                time.sleep(2 ** attempt)  # Exponential backoff
+        except Exception as e:
+            print(f"Unexpected error fetching funding rates: {e}")
+            break
+
+    print("Failed to fetch funding rates after all retries")
+    return {}
+
+
+async def connect_with_retries(url, max_retries=5):
+    """Open a WebSocket connection with automatic reconnects."""
+    print(f"Connecting to {url}")
+    retries = 0
+    while retries < max_retries:
+        try:
+            websocket = await connect(
+                url,
+                ping_interval=20,
+                ping_timeout=10,
+                close_timeout=10,
+                max_size=2**20,  # 1MB max message size
+                compression=None  # Disable compression for better performance
+            )
+            print(f"Successfully connected to {url}")
+            return websocket
+        except Exception as e:
+            retries += 1
+            backoff_time = min(5 * (2 ** (retries - 1)), 60)  # Exponential backoff, max 60s
+            print(f"WebSocket connection failed (attempt {retries}/{max_retries}): {e}")
+            if retries < max_retries:
+                print(f"Retrying in {backoff_time} seconds...")
+                await asyncio.sleep(backoff_time)
+    raise Exception(f"Max retries ({max_retries}) reached. Could not connect to WebSocket: {url}")
+
+
+class Collector:
+    """Streams liquidations and large trades and flushes them to the given sinks."""
+
+    def __init__(self, sinks, aggregator=None, pairlist=None,
+                 aggregation_interval=None, funding_interval=3600, backfill=True, detector=None):
+        self.sinks = list(sinks)
+        self.pairlist = list(pairlist if pairlist is not None else settings.PAIRLIST)
+        self.aggregator = aggregator or Aggregator(
+            symbols=[pair.replace("/", "") for pair in self.pairlist]
+        )
+        self.aggregation_interval = aggregation_interval or timedelta(
+            minutes=settings.AGGREGATION_INTERVAL_MINUTES
+        )
+        self.funding_interval = funding_interval
+        self.detector = detector
+        self.coverage = StreamCoverage()
+        self.backfiller = Backfiller(
+            self.sinks, self.coverage, large_trade_threshold=self.aggregator.large_trade_threshold
+        ) if backfill else None
+        self._bucket_start = time.time()
+
+    async def stream_liquidations(self):
+        """Stream liquidations and aggregate them."""
+        while True:  # Automatischer Reconnect bei Verbindungsabbruch
+            try:
+                async with await connect_with_retries(settings.LIQUIDATION_URL) as websocket:
+                    self.coverage.mark_connected("liquidation")
+                    while True:
+                        try:
+                            msg = await websocket.recv()
+                            order_data = json.loads(msg)['o']
+                            symbol, side = order_data['s'], order_data['S']
+                            price, quantity = float(order_data['p']), float(order_data['q'])
+                            if self.aggregator.add_liquidation(symbol, side, price, quantity) and self.detector:
+                                self.detector.on_liquidation(symbol, side, price * quantity)
+                        except ConnectionClosed:
+                            raise
+                        except Exception as e:
+                            print(f"Error in liquidation stream: {e}")
+                            await asyncio.sleep(5)
+            except Exception as e:
+                self.coverage.mark_disconnected("liquidation")
+                print(f"WebSocket connection error: {e}. Reconnecting...")
+                await asyncio.sleep(5)
+
+    async def stream_large_trades(self):
+        """Stream large trades for every pair and aggregate them."""
+        print('Getting trades')
+        tasks = []
+        for pair in self.pairlist:
+            symbol = pair.replace("/", "").lower()
+            url = settings.TRADE_URL_TEMPLATE.format(symbol)
+            tasks.append(self.stream_trades_for_pair(pair, url))
+        await asyncio.gather(*tasks)
+
+    async def stream_trades_for_pair(self, pair, url):
+        """Stream trades for a single pair."""
+        symbol = pair.replace("/", "")
+        stream = f"trade:{symbol}"
+        while True:  # Automatischer Reconnect bei Verbindungsabbruch
+            try:
+                async with await connect_with_retries(url) as websocket:
+                    self.coverage.mark_connected(stream)
+                    while True:
+                        try:
+                            msg = await websocket.recv()
+                            trade_data_msg = json.loads(msg)
+                            price, quantity = float(trade_data_msg['p']), float(trade_data_msg['q'])
+                            is_buyer_maker = trade_data_msg['m']
+                            if self.aggregator.add_trade(symbol, price, quantity, is_buyer_maker) and self.detector:
+                                self.detector.on_large_trade(symbol, is_buyer_maker, price * quantity)
+                        except ConnectionClosed:
+                            raise
+                        except Exception as e:
+                            print(f"Error in trade stream for {pair}: {e}")
+                            await asyncio.sleep(5)
+            except Exception as e:
+                self.coverage.mark_disconnected(stream)
+                print(f"WebSocket connection error for {pair}: {e}. Reconnecting...")
+                await asyncio.sleep(5)
+
+    async def aggregate_and_store(self):
+        """Flush the aggregated buckets to all sinks every interval."""
+        while True:
+            await asyncio.sleep(self.aggregation_interval.total_seconds())
+            start, end = self._bucket_start, time.time()
+            self._bucket_start = end
+            timestamp = datetime.utcfromtimestamp(end).strftime("%Y-%m-%d %H:%M:%S")
+            liquidations, trades = self.aggregator.flush()
+            self.mark_coverage(start, end, timestamp, liquidations, trades)
+            for sink in self.sinks:
+                try:
+                    sink.write_aggregates(timestamp, liquidations, trades)
+                except Exception as e:
+                    print(f"Error writing aggregates to {type(sink).__name__}: {e}")
+            print(f"Aggregated data stored at {timestamp}")
+
+    def mark_coverage(self, start, end, timestamp, liquidations, trades):
+        """Flag buckets whose stream had a gap and queue the trade buckets for backfill."""
+        liquidations_complete = int(self.coverage.is_complete("liquidation", start))
+        incomplete = 0
+        for symbol in liquidations:
+            liquidations[symbol]["complete"] = liquidations_complete
+            trades_complete = int(self.coverage.is_complete(f"trade:{symbol}", start))
+            trades[symbol]["complete"] = trades_complete
+            if not trades_complete:
+                incomplete += 1
+                if self.backfiller is not None:
+                    self.backfiller.add(symbol, start, end, timestamp, liquidations[symbol])
+        if incomplete or not liquidations_complete:
+            print(f"Incomplete buckets at {timestamp}: "
+                  f"liquidations {'complete' if liquidations_complete else 'incomplete'}, "
+                  f"{incomplete}/{len(trades)} trade streams incomplete")
+
+    async def fetch_and_store_funding_rates(self):
+        """Fetch funding rates periodically and hand them to all sinks."""
+        loop = asyncio.get_running_loop()
+        symbols = set(self.aggregator.symbols)
+        while True:
+            funding_rates = await loop.run_in_executor(None, fetch_funding_rates)
+            funding_rates = {s: r for s, r in funding_rates.items() if s in symbols}
+            timestamp = datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S")
+            for sink in self.sinks:
+                try:
+                    sink.write_funding_rates(timestamp, funding_rates)
+                except Exception as e:
+                    print(f"Error writing funding rates to {type(sink).__name__}: {e}")
+            print("Funding rates updated.")
+            await asyncio.sleep(self.funding_interval)  # Funding Rates alle 1 Stunde aktualisieren
+
+    async def run(self):
+        """Run all streams and the aggregation loop."""
+        print('############################### Starting streams and aggregation ###############################')
+        self._bucket_start = time.time()
+        tasks = [
+            self.stream_liquidations(),
+            self.stream_large_trades(),
+            self.aggregate_and_store(),
+            self.fetch_and_store_funding_rates()
+        ]
+        if self.backfiller is not None:
+            tasks.append(self.backfiller.run())
+        await asyncio.gather(*tasks)
+
+
+def start(client=None):
+    """Run the collector as a standalone service writing to Redis (blocks forever)."""
+    client = check_connection(client)
+    detector = CascadeDetector(publishers=[RedisAlertPublisher(client)])
+    asyncio.run(Collector([RedisSink(client)], detector=detector).run())
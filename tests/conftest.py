@@ -0,0 +1,63 @@
+import json
+import os
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+# Add parent directory to path to import config and liquidation_collector
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class AggTradesStandIn:
+    """Local stand-in for the Binance aggTrades endpoint (startTime/endTime or fromId paging)."""
+
+    def __init__(self):
+        self.trades = []
+        self.requests = []
+        handler = self._handler()
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}/api/v3/aggTrades"
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def _handler(self):
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                query = {k: v[0] for k, v in parse_qs(urlparse(self.path).query).items()}
+                stand_in.requests.append(query)
+                limit = int(query.get('limit', 500))
+                trades = [t for t in stand_in.trades if t['s'] == query['symbol']]
+                if 'fromId' in query:
+                    trades = [t for t in trades if t['a'] >= int(query['fromId'])]
+                else:
+                    start, end = int(query['startTime']), int(query['endTime'])
+                    trades = [t for t in trades if start <= t['T'] <= end]
+                body = json.dumps([{k: v for k, v in t.items() if k != 's'} for t in trades[:limit]])
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.end_headers()
+                self.wfile.write(body.encode())
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def add_trade(self, symbol, timestamp_ms, price, quantity, is_buyer_maker):
+        self.trades.append({
+            'a': len(self.trades), 's': symbol, 'p': str(price), 'q': str(quantity),
+            'T': timestamp_ms, 'm': is_buyer_maker,
+        })
+
+
+@pytest.fixture
+def agg_trades_server():
+    stand_in = AggTradesStandIn()
+    stand_in._thread.start()
+    yield stand_in
+    stand_in.server.shutdown()
+    stand_in.server.server_close()
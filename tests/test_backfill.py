@@ -0,0 +1,169 @@
+import asyncio
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from liquidation_collector.backfill import Backfiller, fetch_agg_trades
+from liquidation_collector.coverage import StreamCoverage
+from liquidation_collector.loader import load_historical_data, merge_historical_data
+from liquidation_collector.persistence import CSV_HEADER
+from liquidation_collector.streams import Collector
+
+START_MS = 1733828400000  # 2024-12-10 11:00:00 UTC
+
+
+class RecordingSink:
+    def __init__(self):
+        self.backfills = []
+
+    def write_aggregates(self, timestamp, liquidations, trades):
+        pass
+
+    def write_backfill(self, timestamp, liquidations, trades):
+        self.backfills.append((timestamp, liquidations, trades))
+
+    def write_funding_rates(self, timestamp, funding_rates):
+        pass
+
+
+def empty_liquidations():
+    return {"long_usd_size": 0, "short_usd_size": 0, "long_count": 0, "short_count": 0, "complete": 1}
+
+
+def test_fetch_agg_trades_pages_through_window(agg_trades_server):
+    for i in range(1200):
+        agg_trades_server.add_trade('BTCUSDT', START_MS + i * 10, 100, 1, False)
+    for _ in range(1500):  # Mehr als eine Seite in derselben Millisekunde
+        agg_trades_server.add_trade('BTCUSDT', START_MS + 30_000, 100, 1, True)
+    agg_trades_server.add_trade('BTCUSDT', START_MS + 60_000, 100, 1, False)  # außerhalb des Fensters
+
+    trades = fetch_agg_trades('BTCUSDT', START_MS, START_MS + 60_000, url=agg_trades_server.url)
+
+    assert [t['a'] for t in trades] == list(range(2700))
+    assert all(t['T'] < START_MS + 60_000 for t in trades)
+    assert len(agg_trades_server.requests) == 3
+    assert 'fromId' in agg_trades_server.requests[1]
+
+
+def test_run_pending_backfills_from_stand_in(agg_trades_server):
+    agg_trades_server.add_trade('BTCUSDT', START_MS + 1_000, 100, 200, False)
+    agg_trades_server.add_trade('BTCUSDT', START_MS + 2_000, 100, 300, True)
+    agg_trades_server.add_trade('BTCUSDT', START_MS + 3_000, 100, 1, True)  # kein großer Trade
+
+    sink, coverage = RecordingSink(), StreamCoverage()
+    coverage.mark_connected('trade:BTCUSDT')
+    backfiller = Backfiller([sink], coverage, url=agg_trades_server.url, large_trade_threshold=10000)
+    start = START_MS / 1000
+    backfiller.add('BTCUSDT', start, start + 60, '2024-12-10 11:01:00', empty_liquidations())
+
+    assert asyncio.run(backfiller.run_pending(now=start + 60)) == 1
+    assert backfiller.pending == {}
+    timestamp, _, trades = sink.backfills[0]
+    assert timestamp == '2024-12-10 11:01:00'
+    assert trades['BTCUSDT'] == {
+        "long_usd_size": 20000.0, "short_usd_size": 30000.0,
+        "long_count": 1, "short_count": 1, "complete": 1,
+    }
+
+
+def test_run_pending_respects_concurrency_limit():
+    lock = threading.Lock()
+    active, peak = [0], [0]
+
+    def fetch(symbol, start_ms, end_ms, url):
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        time.sleep(0.05)
+        with lock:
+            active[0] -= 1
+        return []
+
+    coverage = StreamCoverage()
+    backfiller = Backfiller([RecordingSink()], coverage, concurrency=3, fetch=fetch)
+    for minute in range(12):
+        coverage.mark_connected(f'trade:SYM{minute}USDT')
+        backfiller.add(f'SYM{minute}USDT', 0, 60, '2024-12-10 11:01:00', empty_liquidations())
+
+    assert asyncio.run(backfiller.run_pending(now=60)) == 12
+    assert peak[0] == 3
+
+
+def test_run_pending_gives_up_on_old_entries():
+    calls = []
+    coverage = StreamCoverage()
+    coverage.mark_connected('trade:BTCUSDT')
+    backfiller = Backfiller([RecordingSink()], coverage, max_age=600,
+                            fetch=lambda *args: calls.append(args) or [])
+    backfiller.add('BTCUSDT', 0, 60, '2024-12-10 11:01:00', empty_liquidations())
+
+    assert asyncio.run(backfiller.run_pending(now=60 + 601)) == 0
+    assert backfiller.pending == {}
+    assert calls == []
+
+
+def test_run_pending_waits_for_reconnect_and_retries_failures():
+    attempts = []
+
+    def fetch(symbol, start_ms, end_ms, url):
+        attempts.append(symbol)
+        if len(attempts) == 1:
+            raise ConnectionError("REST unavailable")
+        return []
+
+    sink, coverage = RecordingSink(), StreamCoverage()
+    backfiller = Backfiller([sink], coverage, fetch=fetch)
+    backfiller.add('BTCUSDT', 0, 60, '2024-12-10 11:01:00', empty_liquidations())
+
+    # Stream noch getrennt: nichts abrufen
+    assert asyncio.run(backfiller.run_pending(now=60)) == 0
+    assert attempts == []
+
+    coverage.mark_connected('trade:BTCUSDT')
+    assert asyncio.run(backfiller.run_pending(now=60)) == 0
+    assert ('BTCUSDT', '2024-12-10 11:01:00') in backfiller.pending
+
+    assert asyncio.run(backfiller.run_pending(now=90)) == 1
+    assert backfiller.pending == {}
+    assert len(sink.backfills) == 1
+
+
+def test_mark_coverage_flags_incomplete_buckets():
+    collector = Collector([RecordingSink()], pairlist=['BTC/USDT', 'ETH/USDT'])
+    collector.coverage.mark_connected('liquidation', now=50)
+    collector.coverage.mark_connected('trade:ETHUSDT', now=100)
+    collector.coverage.mark_connected('trade:BTCUSDT', now=130)  # Reconnect innerhalb des Buckets
+
+    liquidations, trades = collector.aggregator.flush()
+    collector.mark_coverage(100, 160, '2024-12-10 11:01:00', liquidations, trades)
+
+    assert liquidations['BTCUSDT']['complete'] == 1
+    assert liquidations['ETHUSDT']['complete'] == 1
+    assert trades['ETHUSDT']['complete'] == 1
+    assert trades['BTCUSDT']['complete'] == 0
+    assert list(collector.backfiller.pending) == [('BTCUSDT', '2024-12-10 11:01:00')]
+
+
+def test_merge_keeps_gaps_as_nan_and_prefers_backfill_rows(tmp_path):
+    csv_file = tmp_path / 'market_data.csv'
+    csv_file.write_text('\n'.join([
+        ','.join(CSV_HEADER),
+        'BTCUSDT,2024-12-10 11:00:30,1,0,500.0,0.0,2,0,30000.0,0.0,0.0001',
+        'BTCUSDT,2024-12-10 11:01:30,,,,,,,,,0.0001',
+        'BTCUSDT,2024-12-10 11:01:30,,,,,3,1,45000.0,12000.0,0.0001',
+    ]) + '\n')
+    dataframe = pd.DataFrame({'date': pd.date_range('2024-12-10 10:59', periods=3, freq='min', tz='UTC')})
+
+    historical_data = load_historical_data(str(csv_file), 'BTCUSDT')
+    merge_historical_data(dataframe, historical_data)
+
+    # Minute ohne Zeile: ruhiger Markt
+    assert dataframe.loc[0, 'liq_long_count'] == 0.0
+    assert dataframe.loc[1, 'trade_long_usd_size'] == 30000.0
+    # Liquidationen bleiben unbekannt, Trades kommen aus der nachgefüllten Zeile
+    assert np.isnan(dataframe.loc[2, 'liq_long_count'])
+    assert np.isnan(dataframe.loc[2, 'liq_short_usd_size'])
+    assert dataframe.loc[2, 'trade_long_count'] == 3
+    assert dataframe.loc[2, 'trade_short_usd_size'] == 12000.0
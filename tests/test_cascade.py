@@ -0,0 +1,155 @@
+import json
+import queue
+import threading
+
+from liquidation_collector.cascade import AlertSubscriber, CascadeDetector, SlidingWindowSum
+
+
+def detector(publishers=None, **kwargs):
+    options = dict(thresholds={5: 100, 60: 300}, imbalance_window=15, imbalance_threshold=0.8,
+                   imbalance_min_usd=100, cooldown=10)
+    options.update(kwargs)
+    return CascadeDetector(publishers=publishers, **options)
+
+
+def test_sliding_window_expires_at_cutoff():
+    window = SlidingWindowSum(5)
+    window.add(0.0, 10)
+    window.add(2.0, 20)
+
+    assert window.expire(4.9) == 30
+    # Ein Event genau am Rand (now - seconds) gehört nicht mehr zum Fenster
+    assert window.expire(5.0) == 20
+    assert window.expire(7.0) == 0
+    window.add(8.0, 5)
+    assert window.total == 5
+
+
+def test_liquidation_threshold_per_window():
+    alerts = []
+    cascade = detector([alerts.append])
+
+    for second in range(4):
+        cascade.on_liquidation('BTCUSDT', 'BUY', 40, timestamp=float(second))
+
+    # 5s-Fenster: 120 >= 100 ab dem dritten Event; 60s-Fenster: 160 < 300
+    assert [(a['type'], a['window'], a['timestamp']) for a in alerts] == [('liquidation_cascade', 5, 2.0)]
+    assert alerts[0]['usd'] == 120
+    assert alerts[0]['side'] == 'long'
+    assert alerts[0]['long_usd'] == 120 and alerts[0]['short_usd'] == 0
+
+    for second in range(20, 30):
+        cascade.on_liquidation('BTCUSDT', 'SELL', 15, timestamp=float(second))
+    windows = [a['window'] for a in alerts]
+    assert windows.count(60) == 1
+    sixty = next(a for a in alerts if a['window'] == 60)
+    assert sixty['usd'] >= 300
+    # Andere Symbole haben eigene Fenster
+    assert cascade.on_liquidation('ETHUSDT', 'BUY', 40, timestamp=30.0) == []
+
+
+def test_imbalance_threshold_and_minimum_usd():
+    alerts = []
+    cascade = detector([alerts.append], imbalance_min_usd=150)
+
+    # Eindeutig einseitig, aber unter imbalance_min_usd
+    assert cascade.on_large_trade('BTCUSDT', False, 100, timestamp=0.0) == []
+    # (140 - 0) / 140 ist einseitig, aber noch unter 150 USD
+    assert cascade.on_large_trade('BTCUSDT', False, 40, timestamp=1.0) == []
+    [alert] = cascade.on_large_trade('BTCUSDT', False, 20, timestamp=2.0)
+    assert alert['type'] == 'trade_imbalance'
+    assert alert['side'] == 'long'
+    assert alert['imbalance'] == 1.0
+    assert alert['window'] == 15
+
+    balanced = detector([], imbalance_min_usd=100)
+    balanced.on_large_trade('ETHUSDT', False, 100, timestamp=0.0)
+    # (100 - 50) / 150 = 0.33 < 0.8
+    assert balanced.on_large_trade('ETHUSDT', True, 50, timestamp=1.0) == []
+    # Nach Ablauf des 15s-Fensters zählt nur noch die Verkaufsseite
+    [alert] = balanced.on_large_trade('ETHUSDT', True, 150, timestamp=16.0)
+    assert alert['side'] == 'short'
+    assert alert['imbalance'] == -1.0
+
+
+def test_cooldown_per_kind_symbol_and_window():
+    alerts = []
+    cascade = detector([alerts.append], thresholds={5: 100, 15: 100})
+
+    cascade.on_liquidation('BTCUSDT', 'BUY', 150, timestamp=0.0)
+    cascade.on_liquidation('ETHUSDT', 'BUY', 150, timestamp=1.0)
+    cascade.on_liquidation('BTCUSDT', 'BUY', 150, timestamp=5.0)
+    cascade.on_liquidation('BTCUSDT', 'BUY', 150, timestamp=10.0)
+
+    keys = [(a['symbol'], a['window'], a['timestamp']) for a in alerts]
+    assert keys == [
+        ('BTCUSDT', 5, 0.0), ('BTCUSDT', 15, 0.0),
+        ('ETHUSDT', 5, 1.0), ('ETHUSDT', 15, 1.0),
+        # 10s nach dem ersten Alarm ist der Cooldown für beide Fenster abgelaufen
+        ('BTCUSDT', 5, 10.0), ('BTCUSDT', 15, 10.0),
+    ]
+
+
+def test_failing_publisher_does_not_break_ingestion():
+    received = []
+
+    def failing(alert):
+        raise ConnectionError("redis down")
+
+    cascade = detector([failing, received.append])
+
+    alerts = cascade.on_liquidation('BTCUSDT', 'BUY', 150, timestamp=0.0)
+    assert len(alerts) == 1
+    assert received == alerts
+    # Die Fenster werden weiter gepflegt
+    cascade.on_liquidation('BTCUSDT', 'BUY', 200, timestamp=1.0)
+    assert [a['window'] for a in received] == [5, 60]
+    assert received[-1]['usd'] == 350
+
+
+class FakePubSub:
+    def __init__(self, messages):
+        self.messages = queue.Queue()
+        for message in messages:
+            self.messages.put(message)
+        self.channels = []
+
+    def subscribe(self, channel):
+        self.channels.append(channel)
+
+    def get_message(self, timeout):
+        try:
+            return self.messages.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def close(self):
+        pass
+
+
+class FakeClient:
+    def __init__(self, pubsub):
+        self._pubsub = pubsub
+
+    def pubsub(self, ignore_subscribe_messages):
+        return self._pubsub
+
+
+def test_alert_subscriber_decodes_messages():
+    alert = {"type": "liquidation_cascade", "symbol": "BTCUSDT", "window": 5, "usd": 312000.0}
+    pubsub = FakePubSub([
+        {"type": "message", "data": b"not json"},
+        {"type": "message", "data": json.dumps(alert).encode()},
+    ])
+    received = queue.Queue()
+    done = threading.Event()
+
+    def callback(message):
+        received.put(message)
+        done.set()
+
+    AlertSubscriber(callback, client=FakeClient(pubsub), channel='test_alerts').start()
+
+    assert done.wait(timeout=5)
+    assert received.get_nowait() == alert
+    assert pubsub.channels == ['test_alerts']
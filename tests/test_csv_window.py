@@ -0,0 +1,115 @@
+import io
+import os
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+from liquidation_collector import settings
+from liquidation_collector.loader import load_historical_data, read_csv_rows
+from liquidation_collector.persistence import CSV_HEADER, TIMESTAMP_FORMAT, compact_csv, seek_timestamp
+
+START = datetime(2024, 12, 10)
+SYMBOLS = ['BTCUSDT', 'ETHUSDT', 'SOLUSDT']
+
+
+def csv_line(symbol, timestamp, value=1):
+    return f"{symbol},{timestamp.strftime(TIMESTAMP_FORMAT)},{value},0,1.5,0.0,{value},0,20000.0,0.0,0.0001\n"
+
+
+def write_market_data(path, minutes, backfills=()):
+    """
+    One row per symbol and minute in append order. ``backfills`` maps the minute
+    after which a late row is appended to the (older) minute it refills.
+    """
+    backfills = dict(backfills)
+    with open(path, 'w') as file:
+        file.write(','.join(CSV_HEADER) + '\n')
+        for minute in range(minutes):
+            timestamp = START + timedelta(minutes=minute, seconds=30)
+            for symbol in SYMBOLS:
+                file.write(csv_line(symbol, timestamp))
+            if minute in backfills:
+                file.write(csv_line('BTCUSDT', START + timedelta(minutes=backfills[minute], seconds=30), 99))
+
+
+def all_rows(path):
+    return pd.read_csv(path, dtype={'timestamp': 'str'})
+
+
+def test_seek_timestamp_never_skips_rows_at_or_after_since(tmp_path):
+    path = tmp_path / 'market_data.csv'
+    write_market_data(path, 600)
+    data = path.read_bytes()
+    header_length = data.index(b'\n') + 1
+    assert len(data) > 64 * 512
+
+    with open(path, 'rb') as file:
+        for minute in [0, 1, 57, 300, 599, 600, 900]:
+            since = (START + timedelta(minutes=minute)).strftime(TIMESTAMP_FORMAT)
+            offset = seek_timestamp(file, since, header_length, block_size=512)
+
+            # Der Offset liegt auf einem Zeilenanfang und davor liegt keine Zeile >= since
+            assert data[offset - 1:offset] == b'\n'
+            before = pd.read_csv(io.BytesIO(data[:offset]), dtype={'timestamp': 'str'})
+            assert (before['timestamp'] < since).all()
+
+
+def test_read_csv_rows_since_matches_full_scan_with_late_backfill(tmp_path):
+    path = tmp_path / 'market_data.csv'
+    lag = settings.BACKFILL_MAX_AGE_MINUTES - 60
+    # Spät angehängte Backfill-Zeilen mitten in der Datei (innerhalb BACKFILL_MAX_AGE_MINUTES)
+    write_market_data(path, 4000, backfills={2000: 2000 - lag, 3500: 3490})
+    assert os.path.getsize(path) > 1 << 16
+
+    full = all_rows(path)
+    for minute in [0, 2000 - lag, 2000 - lag + 1, 3000, 3490, 3999]:
+        since = START + timedelta(minutes=minute)
+        since_str = since.strftime(TIMESTAMP_FORMAT)
+        expected = full[(full['symbol'] == 'BTCUSDT') & (full['timestamp'] >= since_str)]
+
+        rows = read_csv_rows(str(path), ['BTCUSDT'], since=pd.Timestamp(since, tz='UTC'))
+
+        assert list(rows['timestamp']) == list(expected['timestamp'])
+        assert list(rows['liq_long_count']) == list(expected['liq_long_count'])
+
+
+def test_load_historical_data_keeps_funding_rate_float64(tmp_path):
+    path = tmp_path / 'market_data.csv'
+    write_market_data(path, 3)
+    historical_data = load_historical_data(str(path), 'BTCUSDT')
+    assert historical_data['funding_rate'].dtype == 'float64'
+    assert (historical_data['funding_rate'] == 0.0001).all()
+    assert historical_data['liq_long_usd_size'].dtype == 'float32'
+    assert historical_data['liq_long_count'].dtype == 'Int32'
+
+
+def test_compact_csv_keeps_rows_within_retention(tmp_path):
+    path = tmp_path / 'market_data.csv'
+    minutes = 5 * 1440
+    now = START + timedelta(minutes=minutes)
+    cutoff = (now - timedelta(days=1)).strftime(TIMESTAMP_FORMAT)
+    # Backfill für eine Minute knapp innerhalb der Retention, angehängt bis zu BACKFILL_MAX_AGE_MINUTES später
+    late_minute = minutes - 1440 + 5
+    appended_after = late_minute + settings.BACKFILL_MAX_AGE_MINUTES - 10
+    write_market_data(path, minutes, backfills={appended_after: late_minute})
+    before = all_rows(path)
+
+    assert compact_csv(str(path), 1, now=now)
+
+    after = all_rows(path)
+    assert list(after.columns) == CSV_HEADER
+    assert len(after) < len(before)
+    expected = before[before['timestamp'] >= cutoff]
+    kept = after[after['timestamp'] >= cutoff]
+    pd.testing.assert_frame_equal(kept.reset_index(drop=True), expected.reset_index(drop=True))
+    assert (after['liq_long_count'] == 99).sum() == 1
+    assert not os.path.exists(f"{path}.tmp")
+
+
+def test_compact_csv_without_retention_leaves_file_untouched(tmp_path):
+    path = tmp_path / 'market_data.csv'
+    write_market_data(path, 3 * 1440)
+    original = path.read_bytes()
+
+    assert not compact_csv(str(path), 0, now=START + timedelta(days=30))
+    assert path.read_bytes() == original
@@ -0,0 +1,130 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from liquidation_collector.loader import DATA_COLUMNS, merge_ring_buffer, seed_ring_buffers
+from liquidation_collector.persistence import CSV_HEADER, TIMESTAMP_FORMAT
+from liquidation_collector.ring_buffer import RingBuffer, RingBufferStore
+
+
+def row(value):
+    return [float(value)] * len(DATA_COLUMNS)
+
+
+def fill(ring_buffer, minutes):
+    for minute in minutes:
+        ring_buffer.append(minute * 60, row(minute))
+
+
+def dates(*minutes):
+    return pd.DataFrame({'date': pd.to_datetime([m * 60 for m in minutes], unit='s', utc=True)})
+
+
+def test_latest_after_wraparound_is_sorted_and_contiguous():
+    ring_buffer = RingBuffer(5)
+    fill(ring_buffer, range(12))
+
+    timestamps, values = ring_buffer.latest()
+    assert ring_buffer.count == 12
+    assert len(ring_buffer) == 4
+    assert list(timestamps) == [480, 540, 600, 660]
+    assert list(values[:, 0]) == [8, 9, 10, 11]
+    assert np.shares_memory(values, ring_buffer._data)
+
+    timestamps, values = ring_buffer.latest(2)
+    assert list(timestamps) == [600, 660]
+
+
+def test_latest_never_returns_next_write_slot():
+    ring_buffer = RingBuffer(5)
+    fill(ring_buffer, range(7))
+    for minute in range(7, 20):
+        timestamps, values = ring_buffer.latest()
+        before = timestamps.copy()
+        ring_buffer.append(minute * 60, row(minute))
+        # Die View bleibt nach einem weiteren append sortiert und unverändert
+        assert list(timestamps) == list(before)
+        assert np.all(np.diff(timestamps) > 0)
+
+
+def test_update_overwrites_buffered_minute_and_rejects_evicted_one():
+    ring_buffer = RingBuffer(5)
+    fill(ring_buffer, range(8))
+
+    assert ring_buffer.update(6 * 60, row(100))
+    timestamps, values = ring_buffer.latest()
+    assert list(values[:, 0]) == [4, 5, 100, 7]
+    # Auch die gespiegelte Kopie wurde aktualisiert
+    fill(ring_buffer, [8])
+    assert list(ring_buffer.latest()[1][:, 0]) == [5, 100, 7, 8]
+
+    assert not ring_buffer.update(2 * 60, row(100))
+
+
+def test_merge_ring_buffer_marks_missing_minutes_nan_and_sets_last_row():
+    ring_buffer = RingBuffer(10)
+    fill(ring_buffer, [1, 2, 4, 5])
+    dataframe = dates(0, 1, 2, 3, 4)
+
+    merge_ring_buffer(dataframe, ring_buffer)
+
+    column = dataframe['liq_long_count']
+    assert np.isnan(column[0])
+    assert list(column[1:3]) == [1, 2]
+    assert np.isnan(column[3])
+    # Letzte Zeile bekommt den neuesten Bucket wie im Redis-Modus
+    assert column[4] == 5
+
+
+def test_merge_ring_buffer_empty_buffer_is_nan():
+    dataframe = dates(0, 1)
+    merge_ring_buffer(dataframe, RingBuffer(10))
+    assert dataframe[DATA_COLUMNS].isna().all().all()
+
+
+def test_memmap_reopen_readonly(tmp_path):
+    writer = RingBufferStore(5, directory=str(tmp_path))
+    fill(writer.get('BTCUSDT'), range(7))
+    writer.flush()
+
+    reader = RingBufferStore(5, directory=str(tmp_path), readonly=True).get('BTCUSDT')
+    timestamps, values = reader.latest()
+    assert list(timestamps) == [180, 240, 300, 360]
+    assert list(values[:, 0]) == [3, 4, 5, 6]
+
+    # Neue Zeilen des Schreibers sind für den Leser sichtbar
+    fill(writer.get('BTCUSDT'), [7])
+    assert list(reader.latest()[0]) == [240, 300, 360, 420]
+
+    with pytest.raises(ValueError):
+        RingBuffer(6, path=str(tmp_path / 'BTCUSDT.ring'), readonly=True)
+    with pytest.raises(FileNotFoundError):
+        RingBufferStore(5, directory=str(tmp_path), readonly=True).get('ETHUSDT')
+
+
+def test_seed_ring_buffers_fills_quiet_minutes_with_zero(tmp_path):
+    now = pd.Timestamp.now('UTC').tz_localize(None).floor('min')
+
+    def timestamp(minutes_ago):
+        return (now - pd.Timedelta(minutes=minutes_ago) + pd.Timedelta(seconds=30)).strftime(TIMESTAMP_FORMAT)
+
+    csv_file = tmp_path / 'market_data.csv'
+    csv_file.write_text('\n'.join([
+        ','.join(CSV_HEADER),
+        f'BTCUSDT,{timestamp(10)},1,0,500.0,0.0,2,0,30000.0,0.0,0.0',
+        f'BTCUSDT,{timestamp(6)},,,,,1,0,20000.0,0.0,0.0',
+        f'BTCUSDT,{timestamp(5)},3,0,700.0,0.0,0,0,0.0,0.0,0.0',
+    ]) + '\n')
+    store = RingBufferStore(60)
+
+    seed_ring_buffers(store, str(csv_file), ['BTCUSDT', 'ETHUSDT'])
+
+    timestamps, values = store.get('BTCUSDT').latest()
+    first = (now - pd.Timedelta(minutes=10) - pd.Timestamp(0)) // pd.Timedelta(seconds=1)
+    assert list(timestamps) == [first + 60 * i for i in range(6)]
+    liq_long_count = values[:, DATA_COLUMNS.index('liq_long_count')]
+    assert list(liq_long_count[[0, 1, 2, 3, 5]]) == [1, 0, 0, 0, 3]
+    # Unvollständiger Bucket bleibt NaN
+    assert np.isnan(liq_long_count[4])
+    assert values[4, DATA_COLUMNS.index('trade_long_usd_size')] == 20000.0
+    assert store.get('ETHUSDT').count == 0